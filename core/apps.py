@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
     name = "core"
+
+    def ready(self):
+        from . import signals  # noqa
+        from .search import install_search_index
+        post_migrate.connect(install_search_index, sender=self)
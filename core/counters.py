@@ -0,0 +1,50 @@
+# core/counters.py
+"""Збережені лічильники завдань і учасників (Project/Team).
+
+Task.save і сигнали змінюють їх атомарними UPDATE з F(); bulk_create/update()
+сигналів не надсилають - після масових змін запускайте rebuild_counters.
+"""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from core.models import Project, Task, Team
+
+
+def adjust_task_counters(project_id, team_id, is_completed, sign):
+    """Додає (sign=1) або віднімає (sign=-1) завдання з лічильників проєкту й команди"""
+    completed = sign if is_completed else 0
+    # Не нижче нуля: після bulk-змін без rebuild_counters лічильник може відставати,
+    # і звичайний save() не повинен падати на CHECK-обмеженні
+    counters = {
+        'total_tasks': Greatest(F('total_tasks') + sign, 0),
+        'completed_tasks': Greatest(F('completed_tasks') + completed, 0),
+        'open_tasks': Greatest(F('open_tasks') + (sign - completed), 0),
+    }
+    if project_id:
+        Project.objects.filter(pk=project_id).update(**counters)
+    if team_id:
+        Team.objects.filter(pk=team_id).update(**counters)
+
+
+def _count_subquery(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(field)
+        .annotate(count=Count('*')).values('count')
+    ), 0)
+
+
+def refresh_member_count(team_ids=None):
+    """Перераховує member_count одним UPDATE (усі команди, якщо team_ids=None)"""
+    teams = Team.objects.all() if team_ids is None else Team.objects.filter(pk__in=team_ids)
+    return teams.update(member_count=_count_subquery(Team.members.through.objects.all(), 'team_id'))
+
+
+def rebuild_counters():
+    """Перераховує всі лічильники з нуля: по одному UPDATE на модель"""
+    for model, field in ((Project, 'project_id'), (Team, 'team_id')):
+        model.objects.update(
+            total_tasks=_count_subquery(Task.objects.all(), field),
+            completed_tasks=_count_subquery(Task.objects.completed(), field),
+            open_tasks=_count_subquery(Task.objects.active(), field),
+        )
+    refresh_member_count()
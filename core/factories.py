@@ -0,0 +1,64 @@
+# core/factories.py
+"""Спільні фікстури для тестів core, projects і teams"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.models import Position, Project, Task, TaskType, Worker
+from core.pagination import invalidate_counts
+
+
+def create_worker(username, **fields):
+    position, _ = Position.objects.get_or_create(name="Backend Developer")
+    return Worker.objects.create_user(username=username, password="pass", position=position, **fields)
+
+
+def create_project(owner, name="Project", **fields):
+    return Project.objects.create(name=name, description="-", owner=owner, **fields)
+
+
+def build_task(**fields):
+    """Незбережене завдання з типовими значеннями (для bulk_create)"""
+    fields.setdefault("name", "Task")
+    fields.setdefault("description", "-")
+    fields.setdefault("priority", Task.Priority.MEDIUM)
+    if "deadline" not in fields:
+        fields["deadline"] = timezone.now()
+    if "task_type" not in fields:
+        fields["task_type"], _ = TaskType.objects.get_or_create(name="Bug")
+    return Task(**fields)
+
+
+def create_task(**fields):
+    task = build_task(**fields)
+    task.save()
+    return task
+
+
+def create_project_with_tasks(owner, team, workers, size):
+    """Проєкт команди з size завданнями (різні пріоритети, дедлайни, стан) і 1-3 виконавцями на завдання"""
+    project = create_project(owner, name=f"Project {size}")
+    project.teams.add(team)
+    priorities = [choice for choice, _ in Task.Priority.choices]
+    task_type, _ = TaskType.objects.get_or_create(name="Bug")
+    tasks = Task.objects.bulk_create([
+        build_task(
+            name=f"Task {i}",
+            deadline=timezone.now() + timedelta(days=i % 30 - 10),
+            is_completed=i % 3 == 0,
+            priority=priorities[i % len(priorities)],
+            task_type=task_type,
+            project=project,
+            team=team,
+        )
+        for i in range(size)
+    ])
+    Through = Task.assignees.through
+    Through.objects.bulk_create([
+        Through(task_id=task.id, worker_id=worker.id)
+        for task in tasks
+        for worker in workers[:task.id % 3 + 1]
+    ])
+    # bulk_create не надсилає сигналів - скидаємо кеш лічильників вручну
+    invalidate_counts(Task)
+    return project
@@ -39,7 +39,7 @@ class TaskForm(forms.ModelForm):
         self.fields['project'].queryset = Project.objects.filter(is_active=True)
         self.fields['task_type'].queryset = TaskType.objects.all()
         self.fields['team'].queryset = Team.objects.all()
-        self.fields['assignees'].queryset = Worker.objects.all()
+        self.fields['assignees'].queryset = Worker.objects.select_related('position')
 
         # Якщо передано project_id, обмежуємо вибір
         if project_id:
@@ -48,11 +48,8 @@ class TaskForm(forms.ModelForm):
                 self.fields['project'].initial = project
                 self.fields['team'].queryset = project.teams.all()
 
-                # Отримуємо всіх працівників проекту через команди
-                project_workers = set()
-                for team in project.teams.all():
-                    project_workers.update(team.members.all())
-                self.fields['assignees'].queryset = Worker.objects.filter(id__in=[w.id for w in project_workers])
+                # Всі працівники проекту через команди
+                self.fields['assignees'].queryset = Worker.objects.for_project(project).select_related('position')
             except Project.DoesNotExist:
                 pass
 
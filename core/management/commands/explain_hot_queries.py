@@ -0,0 +1,38 @@
+# core/management/commands/explain_hot_queries.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Project, Task
+from core.tasks import daily_digest_rows, tasks_due_tomorrow
+
+
+class Command(BaseCommand):
+    help = 'Показує план виконання (EXPLAIN) для гарячих запитів по завданнях'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help='ID проєкту для запитів сторінки проєкту')
+
+    def handle(self, *args, **options):
+        project_id = options['project'] or Project.objects.values_list('id', flat=True).first() or 0
+
+        queries = {
+            'Список завдань: активні': Task.objects.active().order_by('-deadline', 'id')[:20],
+            'Список завдань: прострочені': Task.objects.overdue().order_by('-deadline', 'id')[:20],
+            'Список завдань: фільтр за пріоритетом': Task.objects.filter(
+                priority=Task.Priority.URGENT
+            ).order_by('-deadline', 'id')[:20],
+            'Список завдань: сортування за назвою': Task.objects.order_by('name', 'id')[:20],
+            'Проєкт: активні завдання': Task.objects.filter(
+                project_id=project_id
+            ).active().order_by('deadline', 'id')[:20],
+            'Проєкт: прострочені завдання': Task.objects.filter(
+                project_id=project_id
+            ).overdue().order_by('deadline', 'id')[:20],
+            'Нагадування: дедлайн завтра': tasks_due_tomorrow().order_by('id').values_list('id', flat=True),
+            'Щоденний дайджест': daily_digest_rows(timezone.now()),
+        }
+
+        for title, queryset in queries.items():
+            self.stdout.write(self.style.SUCCESS(f'🔎 {title}'))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('-' * 50)
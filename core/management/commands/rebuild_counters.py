@@ -0,0 +1,15 @@
+# core/management/commands/rebuild_counters.py
+from django.core.management.base import BaseCommand
+
+from core.counters import rebuild_counters
+from core.models import Project, Team
+
+
+class Command(BaseCommand):
+    help = 'Перераховує збережені лічильники завдань і учасників проєктів та команд'
+
+    def handle(self, *args, **options):
+        rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Лічильники перераховано: {Project.objects.count()} проєктів, {Team.objects.count()} команд'
+        ))
@@ -0,0 +1,20 @@
+# core/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from core.search import SEARCH_MODELS, install_search_index, rebuild_search_index, search_enabled
+
+
+class Command(BaseCommand):
+    help = 'Перебудовує повнотекстовий індекс (FTS5) завдань і проєктів'
+
+    def handle(self, *args, **options):
+        install_search_index()
+        rebuild_search_index()
+
+        for model in SEARCH_MODELS:
+            if search_enabled(model):
+                self.stdout.write(self.style.SUCCESS(f'✅ Індекс перебудовано: {model._meta.db_table}'))
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f'⚠️ FTS5 недоступний для {model._meta.db_table}, пошук працює через icontains'
+                ))
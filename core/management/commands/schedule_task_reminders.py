@@ -0,0 +1,12 @@
+# core/management/commands/schedule_task_reminders.py
+from django.core.management.base import BaseCommand
+
+from core.tasks import schedule_upcoming_task_reminders
+
+
+class Command(BaseCommand):
+    help = 'Ставить у чергу нагадування, час яких настає найближчим часом (як періодичний запуск)'
+
+    def handle(self, *args, **options):
+        count = schedule_upcoming_task_reminders()
+        self.stdout.write(self.style.SUCCESS(f'✅ Заплановано нагадувань: {count}'))
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:50
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(field)
+        .annotate(count=Count('*')).values('count')
+    ), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Task = apps.get_model('core', 'Task')
+    Team = apps.get_model('core', 'Team')
+    for model, field in ((apps.get_model('core', 'Project'), 'project_id'), (Team, 'team_id')):
+        model.objects.update(
+            total_tasks=_count(Task.objects.all(), field),
+            completed_tasks=_count(Task.objects.filter(is_completed=True), field),
+            open_tasks=_count(Task.objects.filter(is_completed=False), field),
+        )
+    Team.objects.update(member_count=_count(Team.members.through.objects.all(), 'team_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_task_hot_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='completed_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='open_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='total_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='completed_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='open_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='total_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:51
+
+import core.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_project_team_counters'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='worker',
+            managers=[
+                ('objects', core.models.WorkerManager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_worker_manager'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectDailySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_tasks', models.PositiveIntegerField(default=0)),
+                ('open_tasks', models.PositiveIntegerField(default=0)),
+                ('completed_tasks', models.PositiveIntegerField(default=0)),
+                ('overdue_tasks', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='core.project')),
+            ],
+            options={
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('project', 'date'), name='project_snapshot_unique_day')],
+            },
+        ),
+    ]
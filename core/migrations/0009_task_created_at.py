@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_projectdailysnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_task_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='reminder_sent_for',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:51
+
+import core.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_task_reminder_sent_for'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSearchIndex',
+            fields=[
+                ('name', models.TextField()),
+                ('description', models.TextField()),
+                ('rank', models.FloatField()),
+                ('project', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='core.project')),
+                ('document', core.models.SearchDocumentField(db_column='core_project_fts')),
+            ],
+            options={
+                'db_table': 'core_project_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskSearchIndex',
+            fields=[
+                ('name', models.TextField()),
+                ('description', models.TextField()),
+                ('rank', models.FloatField()),
+                ('task', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='core.task')),
+                ('document', core.models.SearchDocumentField(db_column='core_task_fts')),
+            ],
+            options={
+                'db_table': 'core_task_fts',
+                'abstract': False,
+                'managed': False,
+            },
+        ),
+    ]
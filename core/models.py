@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.db import models, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.functional import cached_property
 from sorl.thumbnail import ImageField
 
 
@@ -21,6 +24,13 @@ class Position(models.Model):
         verbose_name = "Посада"
         verbose_name_plural = "Посади"
 
+class WorkerManager(UserManager):
+    def for_project(self, project):
+        """Учасники всіх команд проєкту одним запитом (підзапит по членству - без дублікатів)"""
+        members = Team.members.through.objects.filter(team__projects=project).values('worker_id')
+        return self.filter(pk__in=members).order_by('first_name', 'last_name', 'id')
+
+
 class Worker(AbstractUser):
     position = models.ForeignKey(
         Position,
@@ -34,6 +44,8 @@ class Worker(AbstractUser):
         verbose_name="Аватар"
     )
 
+    objects = WorkerManager()
+
     @property
     def full_name(self):
         """Повне ім'я користувача"""
@@ -49,6 +61,45 @@ class Worker(AbstractUser):
         return f"{self.first_name} {self.last_name} ({self.position})" if self.position else "-"
 
 
+class TaskQuerySet(models.QuerySet):
+    """Типові фільтри завдань, що виконуються на боці БД"""
+    # Чим менше число, тим терміновіше завдання
+    PRIORITY_RANK = {
+        'URGENT': 0,
+        'HIGH': 1,
+        'MEDIUM': 2,
+        'LOW': 3,
+    }
+
+    def active(self):
+        return self.filter(is_completed=False)
+
+    def completed(self):
+        return self.filter(is_completed=True)
+
+    def overdue(self):
+        """Невиконані завдання з дедлайном у минулому"""
+        return self.filter(is_completed=False, deadline__lt=timezone.now())
+
+    def with_priority_rank(self):
+        return self.annotate(priority_rank=Case(
+            *[When(priority=priority, then=Value(rank)) for priority, rank in self.PRIORITY_RANK.items()],
+            default=Value(len(self.PRIORITY_RANK)),
+            output_field=IntegerField(),
+        ))
+
+    def order_by_priority(self, descending=False):
+        """Спочатку термінові (або навпаки), далі за дедлайном"""
+        rank = '-priority_rank' if descending else 'priority_rank'
+        return self.with_priority_rank().order_by(rank, 'deadline', 'id')
+
+    def for_listing(self):
+        """Для таблиць і експорту: FK одним JOIN, виконавці разом з посадами"""
+        return self.select_related('project', 'task_type', 'team').prefetch_related(
+            models.Prefetch('assignees', queryset=Worker.objects.select_related('position'))
+        )
+
+
 class Task(models.Model):
     class Priority(models.TextChoices):
         URGENT = "URGENT"
@@ -100,6 +151,27 @@ class Task(models.Model):
         null=True,
         blank=True
     )
+    # null - завдання, створені до появи поля (час створення невідомий)
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        null=True,
+        db_index=True
+    )
+    # Дедлайн, про який уже надіслано нагадування (спільна позначка для всіх воркерів)
+    reminder_sent_for = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    objects = TaskQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запам'ятовуємо значення з БД, щоб сигнали бачили, що саме змінилось
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
 
     def save(
         self,
@@ -113,7 +185,45 @@ class Task(models.Model):
         elif not self.is_completed and self.finished_at:
             self.finished_at = None
 
-        super().save(*args, **kwargs)
+        from core.counters import adjust_task_counters
+        old = None if self._state.adding else self._counted_values()
+        with transaction.atomic(using=kwargs.get('using') or self._state.db):
+            super().save(*args, **kwargs)
+            new = (self.project_id, self.team_id, self.is_completed)
+            if old != new:
+                if old:
+                    adjust_task_counters(*old, sign=-1)
+                adjust_task_counters(*new, sign=1)
+
+        # Тепер "значення з БД" - щойно збережені (повторний save не рахує зміну вдруге)
+        self._remember_loaded_values()
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # Інакше наступний save() порахує зміну від застарілих значень
+        self._remember_loaded_values(fields)
+
+    def _remember_loaded_values(self, fields=None):
+        """Поточні значення полів (усіх або лише fields) вважаємо значеннями з БД"""
+        deferred = self.get_deferred_fields()
+        loaded = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+            and (fields is None or field.name in fields or field.attname in fields)
+        }
+        if fields is None:
+            self._loaded_values = loaded
+        else:
+            self._loaded_values = {**getattr(self, '_loaded_values', {}), **loaded}
+
+    def _counted_values(self):
+        """(project_id, team_id, is_completed) у БД до збереження"""
+        loaded = getattr(self, '_loaded_values', {})
+        if all(key in loaded for key in ('project_id', 'team_id', 'is_completed')):
+            return loaded['project_id'], loaded['team_id'], loaded['is_completed']
+        row = Task.objects.filter(pk=self.pk).values_list('project_id', 'team_id', 'is_completed').first()
+        return tuple(row) if row else None
 
     @property
     def days_until_deadline(self):
@@ -127,7 +237,8 @@ class Task(models.Model):
     @property
     def is_overdue(self):
         """Чи прострочене завдання"""
-        return not self.is_completed and self.days_until_deadline is not None and self.days_until_deadline < 0
+        # Те саме правило, що й TaskQuerySet.overdue()
+        return not self.is_completed and self.deadline is not None and self.deadline < timezone.now()
 
     @property
     def priority_class(self):
@@ -140,7 +251,47 @@ class Task(models.Model):
         }
         return classes.get(self.priority, '')
 
-class Team(models.Model):
+    class Meta:
+        indexes = [
+            # Гарячі шляхи (активні/прострочені, нагадування, дайджест) читають лише невиконані
+            # завдання. Фільтр is_completed=False БД отримує як "NOT is_completed", а таку умову
+            # SQLite не вміє шукати по складеному індексу - тому індекси часткові.
+            models.Index(
+                fields=['project', 'deadline'],
+                condition=Q(is_completed=False),
+                name='task_open_project_deadline_idx'
+            ),
+            models.Index(
+                fields=['deadline'],
+                condition=Q(is_completed=False),
+                name='task_open_deadline_idx'
+            ),
+            models.Index(fields=['priority', 'deadline']),
+            models.Index(fields=['name']),
+        ]
+
+class StoredCountersMixin:
+    """Моделі із збереженими лічильниками (core/counters.py).
+
+    Лічильники змінюються лише атомарними UPDATE з F(). Повний save() (форма
+    редагування, адмінка) інакше записав би назад значення, прочитані раніше,
+    і скасував би інкременти, зроблені між читанням і збереженням.
+    """
+    counter_fields = ()
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if not self._state.adding:
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred
+                ]
+            update_fields = [name for name in update_fields if name not in self.counter_fields]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class Team(StoredCountersMixin, models.Model):
     """Проста модель команди"""
     name = models.CharField(max_length=255, verbose_name="Назва команди")
 
@@ -162,6 +313,13 @@ class Team(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Збережені лічильники (core/counters.py)
+    total_tasks = models.PositiveIntegerField(default=0, editable=False)
+    completed_tasks = models.PositiveIntegerField(default=0, editable=False)
+    open_tasks = models.PositiveIntegerField(default=0, editable=False)
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+    counter_fields = ('total_tasks', 'completed_tasks', 'open_tasks', 'member_count')
+
     def __str__(self):
         return self.name
 
@@ -171,7 +329,32 @@ class Team(models.Model):
         verbose_name_plural = "Команди"
 
 
-class Project(models.Model):
+class ProjectQuerySet(models.QuerySet):
+    def with_task_stats(self):
+        """Прострочені завдання (підзапит, без JOIN) і прогрес зі збережених лічильників"""
+        overdue = Task.objects.overdue().filter(
+            project=OuterRef('pk')
+        ).order_by().values('project').annotate(count=Count('*')).values('count')
+        return self.annotate(
+            overdue_tasks=Coalesce(Subquery(overdue), 0),
+            progress=Case(
+                When(total_tasks=0, then=Value(0)),
+                default=F('completed_tasks') * 100 / F('total_tasks'),
+                output_field=IntegerField(),
+            ),
+        )
+
+    def for_worker(self, worker):
+        """Проєкти, до яких працівник залучений через свої команди"""
+        teams = Project.teams.through.objects.filter(team__members=worker).values('project_id')
+        return self.filter(pk__in=teams).order_by('name', 'id')
+
+    def for_listing(self):
+        """Для списку проєктів: лічильники в рядку, власник JOIN, команди одним запитом"""
+        return self.with_task_stats().select_related('owner').prefetch_related('teams')
+
+
+class Project(StoredCountersMixin, models.Model):
     STAGE_CHOICES = [
         ('planning', '📋 Планування'),
         ('development', '💻 Розробка'),
@@ -201,26 +384,157 @@ class Project(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Збережені лічильники завдань (core/counters.py)
+    total_tasks = models.PositiveIntegerField(default=0, editable=False)
+    completed_tasks = models.PositiveIntegerField(default=0, editable=False)
+    open_tasks = models.PositiveIntegerField(default=0, editable=False)
+    counter_fields = ('total_tasks', 'completed_tasks', 'open_tasks')
+
+    objects = ProjectQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
     # Методи для шаблонів
     def get_active_tasks(self):
-        return self.tasks.filter(is_completed=False)
+        return self.tasks.active()
 
     def get_completed_tasks(self):
-        return self.tasks.filter(is_completed=True)
+        return self.tasks.completed()
+
+    @cached_property
+    def stats(self):
+        """Статистика завдань одним агрегатним запитом (кешується на екземплярі)"""
+        stats = self.tasks.aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(is_completed=True)),
+            active=Count('id', filter=Q(is_completed=False)),
+            overdue=Count('id', filter=Q(is_completed=False, deadline__lt=timezone.now())),
+        )
+        total = stats['total']
+        stats['progress'] = int((stats['completed'] / total) * 100) if total else 0
+        return stats
 
     def get_progress(self):
-        total = self.tasks.count()
-        if total == 0:
-            return 0
-        completed = self.get_completed_tasks().count()
-        return int((completed / total) * 100)
+        """Прогрес зі збережених лічильників, без запиту до завдань"""
+        return int((self.completed_tasks / self.total_tasks) * 100) if self.total_tasks else 0
 
     def get_all_workers(self):
         """Всі працівники, які залучені до проєкту (через команди)"""
-        workers = set()
-        for team in self.teams.all():
-            workers.update(team.members.all())
-        return list(workers)
+        return Worker.objects.for_project(self)
+
+
+class ProjectDailySnapshot(models.Model):
+    """Стан завдань проєкту на кінець дня (пише snapshot_projects) - історія для burndown"""
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="snapshots"
+    )
+    date = models.DateField()
+    total_tasks = models.PositiveIntegerField(default=0)
+    open_tasks = models.PositiveIntegerField(default=0)
+    completed_tasks = models.PositiveIntegerField(default=0)
+    overdue_tasks = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'date'], name='project_snapshot_unique_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} @ {self.date}"
+
+
+class EmailOutbox(models.Model):
+    """Черга листів: задачі лише додають записи, надсилає drain_email_outbox"""
+    class Status(models.TextChoices):
+        PENDING = "PENDING"
+        SENDING = "SENDING"
+        SENT = "SENT"
+        FAILED = "FAILED"
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=512)
+    body = models.TextField()
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Коли запис можна (знову) забрати: час наступної спроби або кінець оренди воркером
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=36, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.to_email}: {self.subject}"
+
+
+class SearchDocumentField(models.TextField):
+    """Прихований стовпець FTS5 з ім'ям таблиці - ліва частина MATCH по всіх стовпцях"""
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class SearchIndex(models.Model):
+    """Рядок FTS5-індексу (таблиці й тригери створює core.search, не міграції).
+
+    Зв'язок один-до-одного по rowid = id дає пошуку звичайний JOIN:
+    фільтр search_index__document__match і ранг search_index__rank.
+    """
+    name = models.TextField()
+    description = models.TextField()
+    # bm25 збігу, менше - релевантніше (лише разом з MATCH)
+    rank = models.FloatField()
+
+    class Meta:
+        abstract = True
+        managed = False
+
+
+class TaskSearchIndex(SearchIndex):
+    task = models.OneToOneField(
+        Task,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_index'
+    )
+    document = SearchDocumentField(db_column='core_task_fts')
+
+    class Meta(SearchIndex.Meta):
+        db_table = 'core_task_fts'
+
+
+class ProjectSearchIndex(SearchIndex):
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_index'
+    )
+    document = SearchDocumentField(db_column='core_project_fts')
+
+    class Meta(SearchIndex.Meta):
+        db_table = 'core_project_fts'
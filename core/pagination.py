@@ -0,0 +1,286 @@
+# core/pagination.py
+import base64
+import binascii
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+def encode_cursor(values):
+    """Непрозорий курсор зі значень ключа сортування останнього рядка"""
+    raw = json.dumps(list(values), cls=DjangoJSONEncoder).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Зворотне до encode_cursor, ValueError для пошкодженого курсора"""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+    if not isinstance(values, list):
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return values
+
+
+def count_cache_version(model):
+    """Поточна версія лічильників моделі; змінюється при кожному записі (див. invalidate_counts)"""
+    return cache.get_or_set(f'count_version:{model._meta.label_lower}', time.time_ns(), None)
+
+
+def invalidate_counts(model):
+    cache.set(f'count_version:{model._meta.label_lower}', time.time_ns(), None)
+
+
+def cached_count(queryset, cache_key=None, cap=None, timeout=60):
+    """COUNT(*) з кешу. Повертає (count, capped).
+
+    cap - рахувати не більше cap рядків: COUNT по підзапиту з LIMIT cap + 1.
+    Без cache_key ключем стає SQL запиту.
+    """
+    if cache_key is None:
+        cache_key = hashlib.md5(str(queryset.query).encode()).hexdigest()
+    key = f'list_count:{count_cache_version(queryset.model)}:{cache_key}:{cap}'
+    result = cache.get(key)
+    if result is None:
+        if cap:
+            count = queryset[:cap + 1].count()
+            result = (min(count, cap), count > cap)
+        else:
+            result = (queryset.count(), False)
+        cache.set(key, result, timeout)
+    return tuple(result)
+
+
+class CappedPage(Page):
+    """Сторінка списку з обмеженим підрахунком: наступна сторінка відома з пробного рядка"""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator з кешованим (і за потреби обмеженим зверху) COUNT(*).
+
+    Якщо рядків більше за count_cap, загальна кількість невідома: сторінки за
+    межею count_cap теж відкриваються, а наступна сторінка визначається пробним
+    рядком (per_page + 1) замість порівняння з num_pages.
+    """
+
+    def __init__(self, *args, count_cache_key=None, count_cap=None, count_timeout=60, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+        self.count_cap = count_cap
+        self.count_timeout = count_timeout
+        self.count_capped = False
+
+    @cached_property
+    def count(self):
+        count, self.count_capped = cached_count(
+            self.object_list, self.count_cache_key, self.count_cap, self.count_timeout
+        )
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # За межею count_cap сторінка може існувати - перевіряє page()
+            if not self.count_capped or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_capped:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows:
+            raise EmptyPage('Сторінка не містить результатів')
+        return CappedPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+
+def _cursor_value(value):
+    # isoformat зберігає мікросекунди (DjangoJSONEncoder їх обрізає)
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+class KeysetPage:
+    """Сторінка курсорної пагінації з тим самим інтерфейсом, що й Page для шаблонів"""
+
+    def __init__(self, object_list, paginator, cursor, next_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return bool(self.cursor)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Курсорна пагінація: сторінка N коштує стільки ж, скільки перша.
+
+    ordering - поля сортування queryset (можна з '-'), останнє має бути унікальним (id).
+    count рахується лише на вимогу і кешується (див. cached_count).
+    """
+
+    def __init__(self, queryset, per_page, ordering, count_cache_key=None, count_cap=None, count_timeout=60):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.count_cache_key = count_cache_key
+        self.count_cap = count_cap
+        self.count_timeout = count_timeout
+        self.count_capped = False
+
+    def _field_value(self, name, value):
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value  # анотація (priority_rank, search_rank)
+        return field.to_python(value)
+
+    def _after(self, values):
+        """Умова "рядок іде після курсора" для змішаних напрямків сортування"""
+        condition = Q()
+        equal = Q()
+        for key, value in zip(self.ordering, values):
+            name = key.lstrip('-')
+            value = self._field_value(name, value)
+            lookup = 'lt' if key.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def page(self, cursor=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != len(self.ordering):
+                raise ValueError(f'Invalid cursor: {cursor}')
+            try:
+                queryset = queryset.filter(self._after(values))
+            except ValidationError as e:
+                raise ValueError(f'Invalid cursor: {cursor}') from e
+
+        # Беремо на один рядок більше, щоб знати, чи є наступна сторінка
+        rows = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                _cursor_value(getattr(last, key.lstrip('-'))) for key in self.ordering
+            )
+        return KeysetPage(rows, self, cursor, next_cursor)
+
+    @cached_property
+    def count(self):
+        count, self.count_capped = cached_count(
+            self.queryset, self.count_cache_key, self.count_cap, self.count_timeout
+        )
+        return count
+
+
+class KeysetPaginationMixin:
+    """Для ListView: ?cursor= (порожній - перша сторінка) вмикає курсорну пагінацію
+    замість OFFSET. Працює з поточним order_by queryset, id додається як tiebreak.
+    """
+    cursor_param = 'cursor'
+
+    def get_keyset_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(key, str) for key in ordering):
+            return None
+        if not ordering or ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering.append('id')
+        return ['id' if key == 'pk' else '-id' if key == '-pk' else key for key in ordering]
+
+    def get_count_kwargs(self):
+        return {}
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_keyset_ordering(queryset)
+        if self.cursor_param not in self.request.GET or ordering is None:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, ordering, **self.get_count_kwargs())
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_param))
+        except ValueError:
+            raise Http404('Некоректний курсор')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Поточні фільтри без параметрів сторінки - для посилань пагінації
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        params.pop(self.cursor_param, None)
+        context['pagination_query'] = params.urlencode()
+        context['keyset'] = isinstance(context.get('paginator'), KeysetPaginator)
+        return context
+
+
+class CachedCountMixin:
+    """Для ListView: кешує COUNT(*) пагінатора за нормалізованим набором фільтрів.
+
+    Кеш скидається при записі в модель (invalidate_counts у сигналах);
+    count_cap обмежує підрахунок ("більше ніж N").
+    """
+    paginator_class = CachedCountPaginator
+    count_cap = None
+    count_timeout = 60
+    count_ignore_params = ('page', 'cursor', 'sort')
+
+    def get_count_cache_key(self):
+        filters = sorted(
+            (key, value.strip())
+            for key, values in self.request.GET.lists()
+            if key not in self.count_ignore_params
+            for value in values
+            if value.strip()
+        )
+        return hashlib.md5(json.dumps([self.model._meta.label_lower, filters]).encode()).hexdigest()
+
+    def get_count_kwargs(self):
+        return {
+            'count_cache_key': self.get_count_cache_key(),
+            'count_cap': self.count_cap,
+            'count_timeout': self.count_timeout,
+        }
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, orphans, allow_empty_first_page, **self.get_count_kwargs(), **kwargs
+        )
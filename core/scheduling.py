@@ -1,6 +1,8 @@
 # core/periodic_tasks.py (створимо новий файл)
 from celery import shared_task
-from django_celery_beat.models import PeriodicTask, CrontabSchedule
+from django_celery_beat.models import PeriodicTask, CrontabSchedule, IntervalSchedule
+
+from core.tasks import REMINDER_SCHEDULE_HORIZON
 
 
 @shared_task
@@ -22,10 +24,40 @@ def setup_periodic_tasks():
         task='core.tasks.clear_expired_sessions',
     )
 
-    # Нагадування про дедлайни щодня о 9 ранку
+    # Нагадування про дедлайни плануються для кожного завдання окремо (ETA),
+    # тому старий щоденний прохід прибираємо
+    PeriodicTask.objects.filter(name='Send deadline reminders').delete()
+
+    # ETA ставляться в чергу лише на REMINDER_SCHEDULE_HORIZON вперед - решту
+    # (разом із завданнями, створеними до переходу) підхоплює цей запуск
+    interval, _ = IntervalSchedule.objects.get_or_create(
+        every=int(REMINDER_SCHEDULE_HORIZON.total_seconds() // 60),
+        period=IntervalSchedule.MINUTES,
+    )
+
+    PeriodicTask.objects.get_or_create(
+        interval=interval,
+        name='Schedule upcoming deadline reminders',
+        task='core.tasks.schedule_upcoming_task_reminders',
+    )
+
+    # Outbox розбирається одразу після додавання листів, а цей запуск
+    # підхоплює повторні спроби і листи, що залишились після падіння воркера
+    interval, _ = IntervalSchedule.objects.get_or_create(
+        every=1,
+        period=IntervalSchedule.MINUTES,
+    )
+
+    PeriodicTask.objects.get_or_create(
+        interval=interval,
+        name='Drain email outbox',
+        task='core.tasks.drain_email_outbox',
+    )
+
+    # Знімок прогресу проєктів наприкінці дня (для burndown)
     schedule, _ = CrontabSchedule.objects.get_or_create(
-        minute='0',
-        hour='9',
+        minute='55',
+        hour='23',
         day_of_week='*',
         day_of_month='*',
         month_of_year='*',
@@ -33,8 +65,8 @@ def setup_periodic_tasks():
 
     PeriodicTask.objects.get_or_create(
         crontab=schedule,
-        name='Send deadline reminders',
-        task='core.tasks.send_task_deadline_reminder',
+        name='Snapshot project progress',
+        task='core.tasks.snapshot_projects',
     )
 
     # Щоденний дайджест о 8 ранку
@@ -0,0 +1,124 @@
+# core/search.py
+"""Повнотекстовий пошук завдань і проєктів (SQLite FTS5).
+
+Індекс - FTS5-таблиці з зовнішнім вмістом поверх core_task/core_project, які
+оновлюють тригери БД (тож bulk_create і update() теж потрапляють в індекс).
+Таблиці й тригери створюються після кожного migrate: при зміні схеми SQLite
+перебудовує таблицю моделі, і тригери старої таблиці зникають.
+Для ORM таблиці індексу описані некерованими моделями (TaskSearchIndex,
+ProjectSearchIndex у core.models) з зв'язком один-до-одного по rowid.
+Якщо FTS5 недоступний (інша БД або збірка SQLite) - пошук через icontains.
+"""
+import logging
+import re
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models import F, Q
+
+from core.models import Project, Task
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODELS = (Task, Project)
+
+TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+        INSERT INTO {fts}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+        INSERT INTO {fts}({fts}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name, description ON {table} BEGIN
+        INSERT INTO {fts}({fts}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {fts}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+# (alias БД, модель) -> чи є FTS-таблиця
+_enabled = {}
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def install_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Створює FTS-таблиці й тригери, якщо їх немає (обробник post_migrate)"""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        existing = set(connection.introspection.table_names(cursor))
+        for model in SEARCH_MODELS:
+            table, fts = model._meta.db_table, fts_table(model)
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                    f"name, description, content='{table}', content_rowid='id', "
+                    f"tokenize='unicode61 remove_diacritics 2')"
+                )
+            except OperationalError as e:
+                logger.warning(f'FTS5 is not available, search falls back to icontains: {e}')
+                return
+            for trigger in TRIGGERS:
+                cursor.execute(trigger.format(table=table, fts=fts))
+            if fts not in existing:
+                # Новий індекс - заповнюємо з наявних рядків
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    for model in SEARCH_MODELS:
+        _enabled.pop((using, model), None)
+
+
+def rebuild_search_index(using=DEFAULT_DB_ALIAS):
+    """Повністю перебудовує FTS-індекси з таблиць моделей"""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for model in SEARCH_MODELS:
+            if search_enabled(model, using):
+                fts = fts_table(model)
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def search_enabled(model, using=DEFAULT_DB_ALIAS):
+    key = (using, model)
+    if key not in _enabled:
+        connection = connections[using]
+        _enabled[key] = (
+            model in SEARCH_MODELS
+            and connection.vendor == 'sqlite'
+            and fts_table(model) in connection.introspection.table_names()
+        )
+    return _enabled[key]
+
+
+def match_expression(text):
+    """Рядок пошуку -> запит FTS5: кожне слово як префікс, усі слова обов'язкові"""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def search_queryset(queryset, text):
+    """Фільтрує queryset за назвою/описом.
+
+    Повертає (queryset, ranked): при ranked=True у рядків є анотація search_rank
+    (bm25, менше - релевантніше).
+    """
+    model = queryset.model
+    match = match_expression(text)
+    if match and search_enabled(model, queryset.db):
+        # FTS-таблиця приєднується до запиту один раз (зв'язок search_index по rowid):
+        # SQLite іде від збігів MATCH до рядків моделі, а rank читається з того ж
+        # рядка індексу. Корельований підзапит з MATCH для кожного рядка заново шукав би всі збіги
+        queryset = queryset.filter(search_index__document__match=match).annotate(
+            search_rank=F('search_index__rank')
+        )
+        return queryset, True
+
+    return queryset.filter(Q(name__icontains=text) | Q(description__icontains=text)), False
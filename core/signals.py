@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.counters import adjust_task_counters, refresh_member_count
+from core.models import Task, Team, Worker
+from core.pagination import invalidate_counts
+from core.tasks import schedule_task_reminder
+
+
+@receiver(post_save, sender=Task)
+def schedule_deadline_reminder(instance, created, **kwargs):
+    """Нове завдання, новий дедлайн або повторне відкриття - плануємо нагадування"""
+    if instance.is_completed:
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    if created or loaded.get('deadline') != instance.deadline or loaded.get('is_completed'):
+        task_id, deadline = instance.pk, instance.deadline
+        transaction.on_commit(lambda: schedule_task_reminder(task_id, deadline), robust=True)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_counts(**kwargs):
+    invalidate_counts(Task)
+
+
+@receiver(post_delete, sender=Task)
+def decrement_task_counters(instance, **kwargs):
+    adjust_task_counters(instance.project_id, instance.team_id, instance.is_completed, sign=-1)
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+def update_member_count(instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_member_count([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        refresh_member_count(pk_set)
+    elif action == 'pre_clear':
+        # Після clear() зв'язків уже не видно - запам'ятовуємо команди працівника
+        instance._cleared_team_ids = list(instance.teams.values_list('id', flat=True))
+    elif action == 'post_clear':
+        refresh_member_count(getattr(instance, '_cleared_team_ids', []))
+
+
+@receiver(pre_delete, sender=Worker)
+def remember_worker_teams(instance, **kwargs):
+    # Видалення працівника каскадно прибирає його членства без m2m_changed
+    instance._member_team_ids = list(instance.teams.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Worker)
+def update_deleted_worker_member_count(instance, **kwargs):
+    refresh_member_count(getattr(instance, '_member_team_ids', []))
@@ -0,0 +1,72 @@
+# core/suggestions.py
+"""Рекомендовані виконавці нового завдання.
+
+Кандидати - учасники команд проєкту та/або обраної команди (або всі активні
+працівники). Спочатку учасники обраної команди, далі - з меншим навантаженням:
+відкриті завдання + OVERDUE_WEIGHT * прострочені. Один анотований запит,
+результат кешується на ASSIGNEE_SUGGESTIONS_CACHE_TIMEOUT секунд.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BooleanField, Count, Exists, F, OuterRef, Q, Value
+from django.utils import timezone
+
+from core.models import Team, Worker
+
+SUGGESTIONS_LIMIT = 10
+# Прострочене завдання "важить" як кілька відкритих
+OVERDUE_WEIGHT = 2
+
+
+def suggestions_cache_key(project_id, team_id, limit):
+    return f'assignee_suggestions:{project_id}:{team_id}:{limit}'
+
+
+def build_assignee_suggestions(project_id=None, team_id=None, limit=SUGGESTIONS_LIMIT):
+    """Рейтинг кандидатів без кешу"""
+    memberships = Team.members.through.objects
+    candidates = Q()
+    if project_id:
+        candidates |= Q(pk__in=memberships.filter(team__projects=project_id).values('worker_id'))
+    if team_id:
+        candidates |= Q(pk__in=memberships.filter(team_id=team_id).values('worker_id'))
+
+    in_team = (
+        Exists(memberships.filter(team_id=team_id, worker_id=OuterRef('pk')))
+        if team_id else Value(False, output_field=BooleanField())
+    )
+    open_task = Q(tasks__is_completed=False)
+    workers = (
+        Worker.objects.filter(candidates, is_active=True)
+        .select_related('position')
+        .annotate(
+            open_tasks=Count('tasks', filter=open_task),
+            overdue_tasks=Count('tasks', filter=open_task & Q(tasks__deadline__lt=timezone.now())),
+            in_team=in_team,
+        )
+        .annotate(load=F('open_tasks') + OVERDUE_WEIGHT * F('overdue_tasks'))
+        .order_by('-in_team', 'load', 'first_name', 'last_name', 'id')[:limit]
+    )
+
+    return [
+        {
+            'id': worker.pk,
+            'name': worker.full_name,
+            'position': worker.position.name if worker.position else None,
+            'open_tasks': worker.open_tasks,
+            'overdue_tasks': worker.overdue_tasks,
+            'in_team': worker.in_team,
+            'load': worker.load,
+        }
+        for worker in workers
+    ]
+
+
+def suggest_assignees(project_id=None, team_id=None, limit=SUGGESTIONS_LIMIT):
+    """Рекомендовані виконавці з кешу (ключ - проєкт і команда)"""
+    key = suggestions_cache_key(project_id, team_id, limit)
+    suggestions = cache.get(key)
+    if suggestions is None:
+        suggestions = build_assignee_suggestions(project_id, team_id, limit)
+        cache.set(key, suggestions, settings.ASSIGNEE_SUGGESTIONS_CACHE_TIMEOUT)
+    return suggestions
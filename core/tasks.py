@@ -1,26 +1,159 @@
 # core/tasks.py (створимо новий файл)
-from celery import shared_task
-from django.core.mail import send_mail
+from celery import group, shared_task
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count, F, Prefetch, Q
 from django.conf import settings
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.contrib.auth import get_user_model
-from .models import Task, Project
+from .models import EmailOutbox, Task, Project, ProjectDailySnapshot
 from datetime import timedelta
+from itertools import islice
 import logging
+import time
+import uuid
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Скільки рядків дайджесту читати з БД за раз
+DIGEST_CHUNK_SIZE = 2000
+# Скільки завдань обробляє одна підзадача нагадувань
+REMINDER_CHUNK_SIZE = 500
+# ETA-нагадування ставляться в чергу лише на найближчий час: Redis-брокер тримає
+# ETA-повідомлення непідтвердженими у воркерах і віддає їх повторно кожен
+# visibility_timeout, тож нагадування на місяці вперед лише накопичувались би.
+# Пізніші підхоплює schedule_upcoming_task_reminders, що запускається з цим інтервалом
+REMINDER_SCHEDULE_HORIZON = timedelta(minutes=10)
+# Outbox: розмір INSERT, оренда рядка воркером і повторні спроби
+OUTBOX_INSERT_CHUNK_SIZE = 1000
+OUTBOX_LEASE = timedelta(minutes=10)
+OUTBOX_RETRY_DELAY = timedelta(minutes=1)
+OUTBOX_MAX_ATTEMPTS = 5
+# Розмір INSERT для щоденних знімків проєктів
+SNAPSHOT_BATCH_SIZE = 1000
+
+
+def chunked(iterable, size):
+    """Розбиває ітерабельне на списки довжиною size"""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def enqueue_emails(messages):
+    """Додає листи в outbox (один INSERT на порцію) і будить drain_email_outbox"""
+    created = 0
+    for batch in chunked(messages, OUTBOX_INSERT_CHUNK_SIZE):
+        created += len(EmailOutbox.objects.bulk_create([
+            EmailOutbox(to_email=recipient, subject=message.subject, body=message.body)
+            for message in batch
+            for recipient in message.to
+        ]))
+    if created:
+        transaction.on_commit(drain_email_outbox.delay, robust=True)
+    return created
+
+
+def claim_outbox_batch(batch_size):
+    """Забирає пачку листів з outbox; паралельні воркери отримують різні рядки"""
+    now = timezone.now()
+    claimable = Q(status=EmailOutbox.Status.PENDING) | Q(status=EmailOutbox.Status.SENDING)
+    ids = list(
+        EmailOutbox.objects.filter(claimable, next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+
+    # Умовний UPDATE: рядок дістається тому, чий UPDATE його змінив.
+    # SENDING з простроченою орендою (воркер впав) забирається повторно.
+    token = uuid.uuid4().hex
+    EmailOutbox.objects.filter(claimable, id__in=ids, next_attempt_at__lte=now).update(
+        status=EmailOutbox.Status.SENDING,
+        claimed_by=token,
+        next_attempt_at=now + OUTBOX_LEASE,
+    )
+    return list(EmailOutbox.objects.filter(id__in=ids, claimed_by=token))
+
+
+@shared_task
+def drain_email_outbox(batch_size=None):
+    """Надсилає листи з outbox пачками через одне SMTP-з'єднання"""
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    connection = get_connection()
+    started = time.monotonic()
+    sent_total = 0
+    failed_total = 0
+
+    try:
+        while rows := claim_outbox_batch(batch_size):
+            batch_started = time.monotonic()
+            sent_ids = []
+            for row in rows:
+                message = EmailMessage(row.subject, row.body, settings.DEFAULT_FROM_EMAIL, [row.to_email])
+                try:
+                    connection.open()
+                    connection.send_messages([message])
+                except Exception as e:
+                    # Після помилки з'єднання може бути зламане - наступний лист відкриє нове
+                    connection.close()
+                    _schedule_outbox_retry(row, e)
+                    failed_total += 1
+                else:
+                    sent_ids.append(row.id)
+
+            EmailOutbox.objects.filter(id__in=sent_ids).update(
+                status=EmailOutbox.Status.SENT,
+                sent_at=timezone.now(),
+            )
+            sent_total += len(sent_ids)
+            logger.info(
+                f'Email outbox batch: sent {len(sent_ids)}/{len(rows)} messages '
+                f'in {time.monotonic() - batch_started:.2f}s'
+            )
+    finally:
+        connection.close()
+
+    elapsed = time.monotonic() - started
+    rate = sent_total / elapsed if elapsed else 0
+    logger.info(
+        f'Email outbox drained: sent {sent_total}, failed {failed_total} '
+        f'in {elapsed:.2f}s ({rate:.1f} msg/s)'
+    )
+    return {'sent': sent_total, 'failed': failed_total, 'seconds': elapsed}
+
+
+def _schedule_outbox_retry(row, error):
+    attempts = row.attempts + 1
+    if attempts >= OUTBOX_MAX_ATTEMPTS:
+        status, next_attempt_at = EmailOutbox.Status.FAILED, row.next_attempt_at
+        logger.error(f'Email to {row.to_email} failed after {attempts} attempts: {error}')
+    else:
+        # Експоненційна затримка: 1, 2, 4, 8... хвилин
+        status = EmailOutbox.Status.PENDING
+        next_attempt_at = timezone.now() + OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+        logger.warning(f'Email to {row.to_email} failed (attempt {attempts}), retry at {next_attempt_at}: {error}')
+    EmailOutbox.objects.filter(id=row.id).update(
+        status=status,
+        attempts=attempts,
+        next_attempt_at=next_attempt_at,
+        last_error=str(error),
+    )
+
 
 @shared_task
 def send_task_assignment_email(task_id, user_ids):
     """Надсилає email при призначенні завдання"""
     try:
         task = Task.objects.get(id=task_id)
-        users = User.objects.filter(id__in=user_ids)
+        users = User.objects.filter(id__in=user_ids).exclude(email='')
+        subject = f'🎯 Нове завдання: {task.name}'
 
+        messages = []
         for user in users:
-            subject = f'🎯 Нове завдання: {task.name}'
             message = f"""
             Вітаємо, {user.get_full_name()}!
 
@@ -36,38 +169,39 @@ def send_task_assignment_email(task_id, user_ids):
             Гарного дня!
             Команда Task Manager
             """
+            messages.append(EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email]))
 
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
-
-            logger.info(f'Email sent to {user.email} about task {task.name}')
+        enqueue_emails(messages)
+        logger.info(f'Queued {len(messages)} emails about task {task.name}')
 
     except Exception as e:
         logger.error(f'Error sending task assignment email: {e}')
 
 
-@shared_task
-def send_task_deadline_reminder():
-    """Нагадування про наближення дедлайну (запускати щодня)"""
-    tomorrow = timezone.now() + timedelta(days=1)
-    tasks = Task.objects.filter(
-        deadline__date=tomorrow.date(),
-        is_completed=False
-    )
+def time_left_phrase(time_left):
+    """Скільки лишилось до дедлайну словами (з округленням): 'через N хв./год.', 'завтра', 'через N дн.'"""
+    minutes = max(round(time_left.total_seconds() / 60), 1)
+    if minutes < 60:
+        return f'через {minutes} хв.'
+    hours = round(minutes / 60)
+    if hours < 24:
+        return f'через {hours} год.'
+    days = round(hours / 24)
+    return 'завтра' if days == 1 else f'через {days} дн.'
+
 
-    for task in tasks:
-        for user in task.assignees.all():
-            if user.email:
-                subject = f'⏰ Нагадування: Завдання "{task.name}" завтра!'
-                message = f"""
+def deadline_reminder_messages(task, when=None):
+    """Листи-нагадування всім виконавцям завдання з email.
+
+    when - коли дедлайн; за замовчуванням рахується від поточного часу, бо близький
+    дедлайн нагадується одразу, а не за TASK_REMINDER_LEAD_TIME.
+    """
+    when = when or time_left_phrase(task.deadline - timezone.now())
+    subject = f'⏰ Нагадування: дедлайн завдання "{task.name}" {when}!'
+    message = f"""
                 Нагадування!
 
-                Завтра дедлайн завдання:
+                Дедлайн завдання {when}:
 
                 📝 Назва: {task.name}
                 📋 Проєкт: {task.project.name if task.project else "Без проєкту"}
@@ -77,14 +211,123 @@ def send_task_deadline_reminder():
 
                 Посилання: http://127.0.0.1:8000/core/tasks/{task.id}/
                 """
+    return [
+        EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])
+        for user in task.assignees.all()
+        if user.email
+    ]
+
+
+def tasks_due_tomorrow():
+    """Невиконані завдання з дедлайном завтра (діапазон, щоб працював індекс по deadline)"""
+    start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return Task.objects.filter(
+        is_completed=False,
+        deadline__gte=start,
+        deadline__lt=start + timedelta(days=1)
+    )
 
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [user.email],
-                    fail_silently=True,
-                )
+
+@shared_task
+def send_task_deadline_reminder():
+    """Повний прохід по завданнях з дедлайном завтра (для ручного запуску, напр. після простою)
+
+    Штатно нагадування плануються для кожного завдання окремо - див. schedule_task_reminder.
+    """
+    task_ids = tasks_due_tomorrow().order_by('id').values_list('id', flat=True)
+
+    chunks = list(chunked(task_ids.iterator(chunk_size=REMINDER_CHUNK_SIZE), REMINDER_CHUNK_SIZE))
+    if chunks:
+        group(send_deadline_reminder_chunk.s(ids) for ids in chunks).apply_async()
+    logger.info(f'Deadline reminders: dispatched {len(chunks)} chunks')
+
+
+def claim_task_reminder(task_id, deadline):
+    """Позначає нагадування про цей дедлайн надісланим; False - надсилати не треба.
+
+    Один умовний UPDATE: завдання виконане, видалене чи дедлайн перенесли - рядок
+    не оновиться; повторна доставка ETA-задачі (брокер, інший воркер) чи ручний
+    прохід теж нічого не оновлять, бо нагадування про цей дедлайн уже позначене.
+    """
+    return bool(
+        Task.objects.filter(id=task_id, is_completed=False, deadline=deadline)
+        .exclude(reminder_sent_for=deadline)
+        .update(reminder_sent_for=deadline)
+    )
+
+
+@shared_task
+def send_deadline_reminder_chunk(task_ids):
+    """Нагадування для порції завдань: проєкти і виконавці підтягуються разом"""
+    tasks = Task.objects.filter(
+        id__in=task_ids,
+        is_completed=False
+    ).exclude(
+        reminder_sent_for=F('deadline')
+    ).select_related('project').prefetch_related(
+        Prefetch('assignees', queryset=User.objects.exclude(email='').only('id', 'email'))
+    )
+
+    messages = []
+    with transaction.atomic():
+        for task in tasks:
+            # Та сама позначка, що й у send_task_reminder: ні ETA-нагадування до цього
+            # проходу, ні ті, що ще в черзі, не надішлють лист удруге
+            if claim_task_reminder(task.pk, task.deadline):
+                messages.extend(deadline_reminder_messages(task, when='завтра'))
+        return enqueue_emails(messages)
+
+
+def schedule_task_reminder(task_id, deadline):
+    """Планує нагадування на (дедлайн - TASK_REMINDER_LEAD_TIME), якщо цей час
+    настає протягом REMINDER_SCHEDULE_HORIZON. Повертає, чи поставлено в чергу."""
+    now = timezone.now()
+    if deadline <= now:
+        return False
+    eta = max(deadline - settings.TASK_REMINDER_LEAD_TIME, now)
+    if eta >= now + REMINDER_SCHEDULE_HORIZON:
+        return False  # заплановане пізніше schedule_upcoming_task_reminders
+    # Дедлайн у аргументах - це "версія": після перенесення старе нагадування нічого не робить
+    send_task_reminder.apply_async(args=[task_id, deadline.isoformat()], eta=eta)
+    return True
+
+
+@shared_task
+def schedule_upcoming_task_reminders():
+    """Ставить у чергу нагадування, час яких настає протягом REMINDER_SCHEDULE_HORIZON.
+
+    Запускається періодично з тим самим інтервалом. Пропущені нагадування (простій
+    beat, завдання до переходу на ETA) теж підхоплюються, поки дедлайн не минув.
+    Повтор безпечний: дублікати відсіює reminder_sent_for.
+    """
+    now = timezone.now()
+    tasks = (
+        Task.objects.filter(
+            is_completed=False,
+            deadline__gt=now,
+            deadline__lt=now + settings.TASK_REMINDER_LEAD_TIME + REMINDER_SCHEDULE_HORIZON,
+        )
+        .exclude(reminder_sent_for=F('deadline'))
+        .order_by('id')
+        .values_list('id', 'deadline')
+    )
+    count = 0
+    for task_id, deadline in tasks.iterator(chunk_size=REMINDER_CHUNK_SIZE):
+        count += schedule_task_reminder(task_id, deadline)
+    logger.info(f'Deadline reminders: scheduled {count} upcoming')
+    return count
+
+
+@shared_task
+def send_task_reminder(task_id, deadline):
+    """Нагадування про одне завдання, заплановане через ETA"""
+    deadline = parse_datetime(deadline)
+    with transaction.atomic():
+        if not claim_task_reminder(task_id, deadline):
+            return 0
+
+        task = Task.objects.select_related('project').get(id=task_id)
+        return enqueue_emails(deadline_reminder_messages(task))
 
 
 @shared_task
@@ -92,57 +335,102 @@ def send_project_update_email(project_id, message):
     """Надсилає оновлення по проєкту всім учасникам"""
     try:
         project = Project.objects.get(id=project_id)
-        users = project.get_all_workers()
+        subject = f'📢 Оновлення проєкту: {project.name}'
 
-        for user in users:
-            if user.email:
-                subject = f'📢 Оновлення проєкту: {project.name}'
-
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [user.email],
-                    fail_silently=True,
-                )
+        enqueue_emails(
+            EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])
+            for user in project.get_all_workers()
+            if user.email
+        )
 
     except Exception as e:
         logger.error(f'Error sending project update email: {e}')
 
 
+def daily_digest_rows(now):
+    """Один згрупований запит по таблиці виконавців: лічильники для кожного користувача
+    з активними завданнями (користувачі без завдань у вибірку не потрапляють)"""
+    return (
+        Task.assignees.through.objects
+        .filter(task__is_completed=False, worker__is_active=True)
+        .exclude(worker__email='')
+        .values('worker_id', 'worker__email')
+        .annotate(
+            active_count=Count('task_id'),
+            overdue_count=Count('task_id', filter=Q(task__deadline__lt=now)),
+            today_count=Count('task_id', filter=Q(task__deadline__date=now.date())),
+        )
+        .order_by('worker_id')
+    )
+
+
 @shared_task
 def send_daily_digest():
     """Щоденний дайджест завдань"""
-    users = User.objects.filter(is_active=True)
-
-    for user in users:
-        if user.email:
-            # Завдання користувача
-            user_tasks = Task.objects.filter(assignees=user, is_completed=False)
-
-            # Прострочені завдання
-            overdue_tasks = [t for t in user_tasks if t.is_overdue]
-
-            # Завдання на сьогодні
-            today_tasks = [t for t in user_tasks if t.deadline.date() == timezone.now().date()]
+    digest_rows = daily_digest_rows(timezone.now())
 
-            if user_tasks:
-                subject = f'📊 Щоденний дайджест завдань'
-                message = f"""
+    subject = f'📊 Щоденний дайджест завдань'
+    messages = (
+        EmailMessage(
+            subject,
+            f"""
                 Щоденний дайджест завдань:
 
-                📌 Всього активних завдань: {user_tasks.count()}
-                ⚠️ Прострочених: {len(overdue_tasks)}
-                📅 На сьогодні: {len(today_tasks)}
+                📌 Всього активних завдань: {row['active_count']}
+                ⚠️ Прострочених: {row['overdue_count']}
+                📅 На сьогодні: {row['today_count']}
 
                 Гарного робочого дня!
-                """
+                """,
+            settings.DEFAULT_FROM_EMAIL,
+            [row['worker__email']],
+        )
+        for row in digest_rows.iterator(chunk_size=DIGEST_CHUNK_SIZE)
+    )
+
+    queued = enqueue_emails(messages)
+    logger.info(f'Daily digest queued for {queued} users')
+
+
+def project_snapshot_rows(now):
+    """Лічильники завдань усіх проєктів одним згрупованим запитом"""
+    return (
+        Task.objects.filter(project__isnull=False)
+        .values('project_id')
+        .annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(is_completed=True)),
+            overdue=Count('id', filter=Q(is_completed=False, deadline__lt=now)),
+        )
+        .order_by()
+    )
 
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [user.email],
-                    fail_silently=True,
-                )
-                
\ No newline at end of file
+
+@shared_task
+def snapshot_projects():
+    """Щоденний знімок прогресу всіх проєктів (повторний запуск за день перезаписує знімок)"""
+    now = timezone.now()
+    today = timezone.localdate(now)
+    counts = {row['project_id']: row for row in project_snapshot_rows(now)}
+
+    snapshots = []
+    for project_id in Project.objects.values_list('id', flat=True).iterator():
+        row = counts.get(project_id, {'total': 0, 'completed': 0, 'overdue': 0})
+        snapshots.append(ProjectDailySnapshot(
+            project_id=project_id,
+            date=today,
+            total_tasks=row['total'],
+            open_tasks=row['total'] - row['completed'],
+            completed_tasks=row['completed'],
+            overdue_tasks=row['overdue'],
+        ))
+
+    ProjectDailySnapshot.objects.bulk_create(
+        snapshots,
+        batch_size=SNAPSHOT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['project', 'date'],
+        update_fields=['total_tasks', 'open_tasks', 'completed_tasks', 'overdue_tasks'],
+    )
+    logger.info(f'Project snapshots for {today}: {len(snapshots)} projects')
+    return len(snapshots)
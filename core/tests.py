@@ -1,3 +1,657 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.management import call_command
+from django.core.paginator import EmptyPage
+from django.core.mail import EmailMessage, get_connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django_celery_beat.models import CrontabSchedule, PeriodicTask
+
+from core.factories import build_task, create_project, create_project_with_tasks, create_task, create_worker
+from core.models import EmailOutbox, Project, Task, Team, Worker
+from core.pagination import CachedCountPaginator, invalidate_counts
+from core.scheduling import setup_periodic_tasks
+from core.search import SEARCH_MODELS, fts_table, search_queryset
+from core.suggestions import build_assignee_suggestions
+from core.tasks import (
+    daily_digest_rows, drain_email_outbox, enqueue_emails, send_daily_digest, send_deadline_reminder_chunk,
+    send_task_deadline_reminder, send_task_reminder, time_left_phrase,
+)
+
+
+class TaskListingQueryCountTests(TestCase):
+    """Кількість запитів для таблиць завдань не залежить від кількості рядків"""
+    sizes = [10, 100, 1000]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_worker("owner")
+        cls.workers = [create_worker(f"worker{i}") for i in range(3)]
+        cls.team = Team.objects.create(name="Core", leader=cls.user)
+        cls.team.members.add(cls.user, *cls.workers)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def create_project(self, size):
+        return create_project_with_tasks(self.user, self.team, self.workers, size)
+
+    def test_for_listing(self):
+        for size in self.sizes:
+            project = self.create_project(size)
+            with self.subTest(size=size), self.assertNumQueries(2):
+                for task in project.tasks.for_listing():
+                    str(task.project), task.task_type.name, str(task.team)
+                    [str(worker) for worker in task.assignees.all()]
+
+    def test_task_list_view(self):
+        for size in self.sizes:
+            self.create_project(size)
+            with self.subTest(size=size), self.assertNumQueries(5):
+                response = self.client.get(reverse("core:task_list"), {"sort": "priority"})
+            self.assertEqual(response.status_code, 200)
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_BATCH_SIZE=25,
+)
+class EmailOutboxTests(TestCase):
+    def enqueue(self, count):
+        return enqueue_emails(
+            EmailMessage(f"Subject {i}", "Body", to=[f"user{i}@example.com"]) for i in range(count)
+        )
+
+    def test_enqueue_is_one_insert(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.enqueue(40), 40)
+
+    def test_drain_sends_everything(self):
+        self.enqueue(60)
+        result = drain_email_outbox()
+        self.assertEqual(result["sent"], 60)
+        self.assertEqual(len(mail.outbox), 60)
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.Status.SENT).exists())
+
+    def test_drain_uses_one_connection_and_logs_each_batch(self):
+        self.enqueue(60)
+        with mock.patch("core.tasks.get_connection", wraps=get_connection) as connect, \
+                self.assertLogs("core.tasks", level="INFO") as logs:
+            drain_email_outbox()
+        self.assertEqual(connect.call_count, 1)
+        batches = [line for line in logs.output if "Email outbox batch" in line]
+        # EMAIL_BATCH_SIZE=25: 25 + 25 + 10
+        self.assertEqual(
+            [line.split("sent ")[1].split(" ")[0] for line in batches],
+            ["25/25", "25/25", "10/10"],
+        )
+
+    def test_failed_message_is_retried_later(self):
+        self.enqueue(1)
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=ConnectionError("SMTP down"),
+        ):
+            with self.assertLogs("core.tasks", level="WARNING") as logs:
+                result = drain_email_outbox()
+        self.assertEqual(result["failed"], 1)
+        self.assertIn("failed (attempt 1)", logs.output[0])
+        row = EmailOutbox.objects.get()
+        self.assertEqual(row.status, EmailOutbox.Status.PENDING)
+        self.assertEqual(row.attempts, 1)
+        self.assertGreater(row.next_attempt_at, timezone.now())
+        # До настання next_attempt_at лист не забирається повторно
+        self.assertEqual(drain_email_outbox()["sent"], 0)
+
+
+class DailyDigestTests(TestCase):
+    def test_counts_per_user(self):
+        alice, bob, no_email, inactive = [
+            create_worker(name, email=email, is_active=active)
+            for name, email, active in (
+                ("alice", "alice@example.com", True),
+                ("bob", "bob@example.com", True),
+                ("noemail", "", True),
+                ("inactive", "inactive@example.com", False),
+            )
+        ]
+        now = timezone.now()
+        specs = [
+            (now - timedelta(days=2), False, [alice, bob, no_email, inactive]),
+            (now, False, [alice]),
+            (now + timedelta(days=5), False, [alice]),
+            (now - timedelta(days=2), True, [alice, bob]),  # виконане - не рахується
+        ]
+        for deadline, done, assignees in specs:
+            create_task(deadline=deadline, is_completed=done).assignees.add(*assignees)
+
+        with self.assertNumQueries(1):
+            rows = list(daily_digest_rows(now))
+        self.assertEqual(
+            [(r["worker__email"], r["active_count"], r["overdue_count"], r["today_count"]) for r in rows],
+            [("alice@example.com", 3, 1, 1), ("bob@example.com", 1, 1, 0)],
+        )
+
+        send_daily_digest()
+        self.assertEqual(
+            sorted(EmailOutbox.objects.values_list("to_email", flat=True)),
+            ["alice@example.com", "bob@example.com"],
+        )
+
+
+class DeadlineReminderChunkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice, cls.bob, no_email = [
+            create_worker(name, email=email)
+            for name, email in (("alice", "alice@example.com"), ("bob", "bob@example.com"), ("noemail", ""))
+        ]
+        project = create_project(cls.alice)
+        cls.task = create_task(name="Open", project=project)
+        cls.task.assignees.add(cls.alice, cls.bob, no_email)
+        cls.done = create_task(name="Done", is_completed=True)
+        cls.done.assignees.add(cls.alice)
+
+    def test_one_message_per_assignee_email(self):
+        # завдання з проєктами, виконавці, позначка для кожного завдання, INSERT в outbox
+        # (+ SAVEPOINT/RELEASE транзакції)
+        with self.assertNumQueries(6):
+            self.assertEqual(send_deadline_reminder_chunk([self.task.pk, self.done.pk]), 2)
+        rows = EmailOutbox.objects.order_by("to_email")
+        self.assertEqual([row.to_email for row in rows], ["alice@example.com", "bob@example.com"])
+        self.assertTrue(all('"Open" завтра' in row.subject for row in rows))
+
+    def test_shares_sent_marker_with_eta_reminders(self):
+        deadline = self.task.deadline.isoformat()
+        # ETA-нагадування вже пішло - ручний прохід його не повторює
+        self.assertEqual(send_task_reminder(self.task.pk, deadline), 2)
+        self.assertEqual(send_deadline_reminder_chunk([self.task.pk]), 0)
+        # І навпаки: ETA-задача, що ще в черзі, після проходу нічого не надсилає
+        Task.objects.filter(pk=self.task.pk).update(reminder_sent_for=None)
+        self.assertEqual(send_deadline_reminder_chunk([self.task.pk]), 2)
+        self.assertEqual(send_task_reminder(self.task.pk, deadline), 0)
+        self.assertEqual(EmailOutbox.objects.count(), 4)
+
+    def test_dispatch_splits_into_chunks(self):
+        tomorrow = timezone.localtime().replace(hour=12, minute=0) + timedelta(days=1)
+        Task.objects.filter(pk=self.task.pk).update(deadline=tomorrow)
+        with mock.patch("core.tasks.group") as group:
+            send_task_deadline_reminder()
+        chunks = [signature.args for signature in group.call_args.args[0]]
+        self.assertEqual(chunks, [([self.task.pk],)])
+
+
+class TaskReminderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_worker("alice", email="alice@example.com")
+        cls.deadline = timezone.now() + timedelta(days=3)
+        cls.task = create_task(name="Release", deadline=cls.deadline)
+        cls.task.assignees.add(cls.alice)
+
+    def test_sent_once_per_deadline(self):
+        self.assertEqual(send_task_reminder(self.task.pk, self.deadline.isoformat()), 1)
+        # Повторна доставка тієї ж ETA-задачі
+        self.assertEqual(send_task_reminder(self.task.pk, self.deadline.isoformat()), 0)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.reminder_sent_for, self.deadline)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_subject_says_when_deadline_is(self):
+        send_task_reminder(self.task.pk, self.deadline.isoformat())
+        self.assertIn('"Release" через 3 дн.', EmailOutbox.objects.get().subject)
+
+    def test_deadline_inside_lead_time(self):
+        # Нагадування про близький дедлайн іде одразу - лист не каже "завтра"
+        deadline = timezone.now() + timedelta(hours=1)
+        Task.objects.filter(pk=self.task.pk).update(deadline=deadline)
+        send_task_reminder(self.task.pk, deadline.isoformat())
+        self.assertIn('"Release" через 1 год.', EmailOutbox.objects.get().subject)
+
+    def test_time_left_phrase(self):
+        self.assertEqual(time_left_phrase(timedelta(hours=23, minutes=59, seconds=50)), "завтра")
+        self.assertEqual(time_left_phrase(timedelta(days=2)), "через 2 дн.")
+        self.assertEqual(time_left_phrase(timedelta(minutes=90)), "через 2 год.")
+        self.assertEqual(time_left_phrase(timedelta(seconds=10)), "через 1 хв.")
+
+    def test_stale_or_completed_is_noop(self):
+        moved = self.deadline + timedelta(days=1)
+        Task.objects.filter(pk=self.task.pk).update(deadline=moved)
+        self.assertEqual(send_task_reminder(self.task.pk, self.deadline.isoformat()), 0)
+        Task.objects.filter(pk=self.task.pk).update(is_completed=True)
+        self.assertEqual(send_task_reminder(self.task.pk, moved.isoformat()), 0)
+        self.assertEqual(send_task_reminder(0, moved.isoformat()), 0)
+        self.assertFalse(EmailOutbox.objects.exists())
+
+
+def upcoming_deadline(minutes=5):
+    """Дедлайн, нагадування про який припадає на найближчі хвилини"""
+    return timezone.now() + settings.TASK_REMINDER_LEAD_TIME + timedelta(minutes=minutes)
+
+
+@mock.patch("core.tasks.send_task_reminder.apply_async")
+class ReminderSchedulingTests(TestCase):
+    def save_and_commit(self, task):
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+
+    def test_new_task_is_scheduled_after_commit(self, apply_async):
+        deadline = upcoming_deadline()
+        with self.captureOnCommitCallbacks() as callbacks:
+            task = create_task(deadline=deadline)
+        apply_async.assert_not_called()
+        for callback in callbacks:
+            callback()
+        apply_async.assert_called_once_with(
+            args=[task.pk, deadline.isoformat()], eta=deadline - settings.TASK_REMINDER_LEAD_TIME
+        )
+
+    def test_only_deadline_change_or_reopen_reschedules(self, apply_async):
+        task = create_task(deadline=upcoming_deadline())
+        task.name = "Renamed"
+        self.save_and_commit(task)
+        apply_async.assert_not_called()
+
+        task.deadline += timedelta(minutes=1)
+        self.save_and_commit(task)
+        self.assertEqual(apply_async.call_args.kwargs["args"][1], task.deadline.isoformat())
+
+        task.is_completed = True
+        self.save_and_commit(task)
+        task.is_completed = False
+        self.save_and_commit(task)
+        self.assertEqual(apply_async.call_count, 2)
+
+    def test_completed_or_past_tasks_are_not_scheduled(self, apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_task(deadline=upcoming_deadline(), is_completed=True)
+            create_task(deadline=timezone.now() - timedelta(hours=1))
+        apply_async.assert_not_called()
+
+    def test_close_deadline_is_sent_right_away(self, apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_task(deadline=timezone.now() + timedelta(hours=1))
+        self.assertLessEqual(apply_async.call_args.kwargs["eta"], timezone.now())
+
+    def test_far_deadline_waits_for_sweep(self, apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_task(deadline=upcoming_deadline(minutes=60))
+        apply_async.assert_not_called()
+
+
+@mock.patch("core.tasks.send_task_reminder.apply_async")
+class ReminderSweepTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.due = create_task(name="due", deadline=upcoming_deadline())
+        cls.missed = create_task(name="missed", deadline=now + timedelta(hours=1))
+        create_task(name="later", deadline=upcoming_deadline(minutes=60))
+        reminded = create_task(name="reminded", deadline=upcoming_deadline())
+        Task.objects.filter(pk=reminded.pk).update(reminder_sent_for=reminded.deadline)
+        create_task(name="done", deadline=upcoming_deadline(), is_completed=True)
+        create_task(name="past", deadline=now - timedelta(days=2))
+
+    def test_command_schedules_only_upcoming_reminders(self, apply_async):
+        out = StringIO()
+        call_command("schedule_task_reminders", stdout=out)
+        self.assertIn("2", out.getvalue())
+        scheduled = sorted(call.kwargs["args"][0] for call in apply_async.call_args_list)
+        self.assertEqual(scheduled, sorted([self.due.pk, self.missed.pk]))
+
+    def test_setup_registers_sweep(self, apply_async):
+        schedule, _ = CrontabSchedule.objects.get_or_create(minute="0", hour="9")
+        PeriodicTask.objects.create(
+            crontab=schedule, name="Send deadline reminders", task="core.tasks.send_task_deadline_reminder"
+        )
+        setup_periodic_tasks()
+        setup_periodic_tasks()
+        self.assertFalse(PeriodicTask.objects.filter(name="Send deadline reminders").exists())
+        sweep = PeriodicTask.objects.get(task="core.tasks.schedule_upcoming_task_reminders")
+        self.assertEqual((sweep.interval.every, sweep.interval.period), (10, "minutes"))
+        apply_async.assert_not_called()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_worker("tester")
+        cls.tasks = Task.objects.bulk_create([
+            build_task(name=name, description=description)
+            for name, description in [
+                ("Оновити документацію", "Описати API звітів"),
+                ("Звіти для клієнта", "Звіти, звіти і ще раз звіти"),
+                ("Виправити логін", "Помилка авторизації"),
+            ]
+        ])
+
+    def search(self, text):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("core:task_list"), {"search": text})
+        return [task.name for task in response.context["tasks"]]
+
+    def test_prefix_search_is_ranked(self):
+        self.assertEqual(self.search("звіт"), ["Звіти для клієнта", "Оновити документацію"])
+
+    def test_index_follows_updates(self):
+        Task.objects.filter(pk=self.tasks[2].pk).update(name="Виправити звіт")
+        self.assertIn("Виправити звіт", self.search("звіт"))
+        Task.objects.filter(pk=self.tasks[1].pk).delete()
+        self.assertNotIn("Звіти для клієнта", self.search("звіт"))
+
+    def test_punctuation_only_falls_back_to_icontains(self):
+        self.assertEqual(self.search(","), ["Звіти для клієнта"])
+
+    def test_index_is_joined_once(self):
+        for model in SEARCH_MODELS:
+            self.assertEqual(model.search_index.related.related_model._meta.db_table, fts_table(model))
+        for queryset in (Task.objects.for_listing(), Project.objects.for_listing()):
+            queryset, ranked = search_queryset(queryset, "звіт")
+            self.assertTrue(ranked)
+            plan = queryset.order_by("search_rank").explain()
+            # Один прохід по збігах; підзапит з MATCH для кожного рядка - квадратична складність
+            self.assertEqual(plan.count("VIRTUAL TABLE INDEX"), 1, plan)
+
+    def test_ranked_search_pages_by_cursor(self):
+        self.client.force_login(self.user)
+        url = reverse("core:task_list")
+        response = self.client.get(url, {"search": "звіт", "cursor": ""})
+        names = [task.name for task in response.context["tasks"]]
+        self.assertEqual(names, ["Звіти для клієнта", "Оновити документацію"])
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_worker("pager")
+        priorities = [choice for choice, _ in Task.Priority.choices]
+        deadline = timezone.now()
+        # Однакові дедлайни і назви перевіряють tiebreak по id
+        Task.objects.bulk_create([
+            build_task(
+                name=f"Task {i % 7}",
+                deadline=deadline + timedelta(days=i % 5),
+                priority=priorities[i % len(priorities)],
+            )
+            for i in range(53)
+        ])
+        invalidate_counts(Task)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_walks_every_sort_without_gaps(self):
+        for sort in ["deadline", "-deadline", "name", "-name", "priority", "-priority"]:
+            expected = [
+                task.pk
+                for page in range(1, 4)
+                for task in self.client.get(
+                    reverse("core:task_list"), {"sort": sort, "page": page}
+                ).context["tasks"]
+            ]
+            seen, cursor = [], ""
+            while cursor is not None:
+                response = self.client.get(reverse("core:task_list"), {"sort": sort, "cursor": cursor})
+                seen.extend(task.pk for task in response.context["tasks"])
+                cursor = response.context["page_obj"].next_cursor
+            with self.subTest(sort=sort):
+                self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("core:task_list"), {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+
+class CachedCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_worker("counter")
+        Task.objects.bulk_create([build_task(name=f"Task {i}") for i in range(25)])
+        invalidate_counts(Task)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_count_is_cached_per_filter_set(self):
+        url = reverse("core:task_list")
+        response = self.client.get(url, {"status": "active", "sort": "name"})
+        self.assertEqual(response.context["paginator"].count, 25)
+        # Той самий набір фільтрів (інше сортування, сторінка) - COUNT з кешу
+        with self.assertNumQueries(4):
+            self.client.get(url, {"sort": "-name", "status": "active", "page": 2})
+
+    def test_task_save_invalidates_count(self):
+        url = reverse("core:task_list")
+        self.client.get(url)
+        create_task(name="New")
+        self.assertEqual(self.client.get(url).context["paginator"].count, 26)
+
+    def test_cap(self):
+        paginator = CachedCountPaginator(Task.objects.order_by("id"), 10, count_cap=20)
+        self.assertEqual(paginator.count, 20)
+        self.assertTrue(paginator.count_capped)
+
+    def test_pages_past_the_cap(self):
+        create_task(name="New")  # 26 рядків
+        tasks = Task.objects.order_by("id")
+        paginator = CachedCountPaginator(tasks, 10, count_cap=20)
+        page = paginator.page(2)
+        self.assertTrue(page.has_next())
+        self.assertEqual(page.next_page_number(), 3)
+        page = paginator.page(3)
+        self.assertEqual(list(page), list(tasks[20:]))
+        self.assertEqual((page.start_index(), page.end_index()), (21, 26))
+        self.assertFalse(page.has_next())
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+        # Без обмеження поведінка звичайного Paginator
+        with self.assertRaises(EmptyPage):
+            CachedCountPaginator(tasks, 10).page(4)
+
+
+class TaskQuerySetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.late = create_task(name="late", deadline=now - timedelta(hours=1), priority="LOW")
+        cls.done = create_task(name="done", deadline=now - timedelta(days=1), priority="URGENT", is_completed=True)
+        cls.soon = create_task(name="soon", deadline=now + timedelta(hours=1), priority="URGENT")
+        cls.later = create_task(name="later", deadline=now + timedelta(days=2), priority="URGENT")
+        cls.high = create_task(name="high", deadline=now + timedelta(days=1), priority="HIGH")
+
+    def test_overdue(self):
+        self.assertEqual(list(Task.objects.overdue()), [self.late])
+
+    def test_is_overdue_matches_queryset(self):
+        overdue = set(Task.objects.overdue())
+        for task in Task.objects.all():
+            self.assertEqual(task.is_overdue, task in overdue, task.name)
+        # Година до дедлайну - ще не прострочене, навіть якщо днів до нього 0
+        self.assertFalse(self.soon.is_overdue)
+
+    def test_order_by_priority(self):
+        names = [task.name for task in Task.objects.order_by_priority()]
+        # За терміновістю, не за алфавітом; однаковий пріоритет - за дедлайном
+        self.assertEqual(names, ["done", "soon", "later", "high", "late"])
+        names = [task.name for task in Task.objects.order_by_priority(descending=True)]
+        self.assertEqual(names, ["late", "high", "done", "soon", "later"])
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_worker("lead")
+        cls.other = create_worker("dev")
+
+    def assertCounters(self, obj, total, completed, open_):
+        obj.refresh_from_db()
+        self.assertEqual((obj.total_tasks, obj.completed_tasks, obj.open_tasks), (total, completed, open_))
+
+    def test_task_changes_update_counters(self):
+        project = create_project(self.user, name="A")
+        other = create_project(self.user, name="B")
+        team = Team.objects.create(name="Core", leader=self.user)
+        task = create_task(project=project, team=team)
+        create_task(project=project)
+        self.assertCounters(project, 2, 0, 2)
+        self.assertCounters(team, 1, 0, 1)
+
+        task.is_completed = True
+        task.save()
+        task.save()
+        self.assertCounters(project, 2, 1, 1)
+        self.assertCounters(team, 1, 1, 0)
+
+        task.project = other
+        task.save()
+        self.assertCounters(project, 1, 0, 1)
+        self.assertCounters(other, 1, 1, 0)
+
+        Task.objects.get(pk=task.pk).delete()
+        self.assertCounters(other, 0, 0, 0)
+        self.assertCounters(team, 0, 0, 0)
+        self.assertEqual(project.get_progress(), 0)
+
+    def test_member_count(self):
+        team = Team.objects.create(name="Core", leader=self.user)
+        team.members.add(self.user, self.other)
+        team.members.remove(self.other, self.other)
+        team.refresh_from_db()
+        self.assertEqual(team.member_count, 1)
+        self.user.teams.clear()
+        team.refresh_from_db()
+        self.assertEqual(team.member_count, 0)
+
+    def test_full_save_keeps_counters(self):
+        project = create_project(self.user)
+        team = Team.objects.create(name="Core", leader=self.user)
+        # Екземпляри прочитані до змін (як у формі редагування)
+        stale_project, stale_team = Project.objects.get(pk=project.pk), Team.objects.get(pk=team.pk)
+        create_task(project=project, team=team)
+        team.members.add(self.user)
+
+        stale_project.name = "Renamed"
+        stale_project.save()
+        stale_team.name = "Renamed"
+        stale_team.save()
+        self.assertCounters(stale_project, 1, 0, 1)
+        self.assertCounters(stale_team, 1, 0, 1)
+        self.assertEqual((stale_project.name, stale_team.member_count), ("Renamed", 1))
+
+    def test_refresh_from_db_updates_loaded_values(self):
+        first, second = create_project(self.user, name="A"), create_project(self.user, name="B")
+        task = create_task(project=first)
+        moved = Task.objects.get(pk=task.pk)
+        moved.project = second
+        moved.save()
+
+        task.refresh_from_db()
+        task.is_completed = True
+        task.save()
+        self.assertCounters(first, 0, 0, 0)
+        self.assertCounters(second, 1, 1, 0)
+
+    def test_deleting_worker_updates_member_count(self):
+        team = Team.objects.create(name="Core", leader=self.user)
+        leaving = create_worker("leaving")
+        team.members.add(self.user, leaving)
+        leaving.delete()
+        team.refresh_from_db()
+        self.assertEqual(team.member_count, 1)
+
+    def test_rebuild_counters(self):
+        project = create_project(self.user)
+        Task.objects.bulk_create([build_task(project=project, is_completed=i % 4 == 0) for i in range(8)])
+        call_command("rebuild_counters", stdout=StringIO())
+        self.assertCounters(project, 8, 2, 6)
+        self.assertEqual(project.get_progress(), 25)
+
+
+class ExplainHotQueriesTests(TestCase):
+    def test_explains_every_query(self):
+        project = create_project(create_worker("owner"))
+        create_task(project=project)
+        for args in ([], ["--project", str(project.pk)]):
+            out = StringIO()
+            call_command("explain_hot_queries", *args, stdout=out)
+            output = out.getvalue()
+            self.assertEqual(output.count("🔎"), 8)
+            self.assertIn("Нагадування: дедлайн завтра", output)
+            self.assertIn("Щоденний дайджест", output)
+
+
+class ProjectMembershipTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.workers = [create_worker(f"w{i}") for i in range(4)]
+        cls.project = create_project(cls.workers[0], name="A")
+        cls.other = create_project(cls.workers[0], name="B")
+        for i in range(3):
+            team = Team.objects.create(name=f"Team {i}", leader=cls.workers[0])
+            # w0 у всіх командах, w3 - у жодній
+            team.members.add(cls.workers[0], cls.workers[i])
+            cls.project.teams.add(team)
+        cls.other.teams.add(team)
+
+    def test_for_project_is_one_distinct_query(self):
+        with self.assertNumQueries(1):
+            workers = list(Worker.objects.for_project(self.project))
+        self.assertEqual([w.pk for w in workers], [w.pk for w in self.workers[:3]])
+
+    def test_for_worker(self):
+        self.assertEqual(list(Project.objects.for_worker(self.workers[0])), [self.project, self.other])
+        self.assertEqual(list(Project.objects.for_worker(self.workers[1])), [self.project])
+        self.assertFalse(Project.objects.for_worker(self.workers[3]).exists())
+
+
+class AssigneeSuggestionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.busy, cls.late, cls.free, cls.outsider = [
+            create_worker(name) for name in ("busy", "late", "free", "outsider")
+        ]
+        cls.team = Team.objects.create(name="Core", leader=cls.busy)
+        cls.team.members.add(cls.busy, cls.late, cls.free)
+        cls.other_team = Team.objects.create(name="Ops", leader=cls.outsider)
+        cls.other_team.members.add(cls.outsider)
+        cls.project = create_project(cls.busy)
+        cls.project.teams.add(cls.team, cls.other_team)
+        now = timezone.now()
+        for deadline, worker in [
+            (now + timedelta(days=1), cls.busy),
+            (now + timedelta(days=1), cls.busy),
+            (now + timedelta(days=2), cls.busy),
+            (now + timedelta(days=3), cls.busy),
+            (now - timedelta(days=1), cls.late),
+        ]:
+            create_task(deadline=deadline).assignees.add(worker)
+
+    def test_ranking(self):
+        with self.assertNumQueries(1):
+            suggestions = build_assignee_suggestions(self.project.pk, self.other_team.pk)
+        self.assertEqual(
+            [s["id"] for s in suggestions],
+            [self.outsider.pk, self.free.pk, self.late.pk, self.busy.pk],
+        )
+        self.assertEqual((suggestions[2]["open_tasks"], suggestions[2]["overdue_tasks"]), (1, 1))
+
+    def test_cached_endpoint(self):
+        self.client.force_login(self.busy)
+        url = reverse("core:task_suggest_assignees")
+        first = self.client.get(url, {"team": self.team.pk}).json()["suggestions"]
+        self.assertEqual([s["id"] for s in first], [self.free.pk, self.late.pk, self.busy.pk])
+        with self.assertNumQueries(2):  # лише сесія і користувач
+            self.client.get(url, {"team": self.team.pk})
+        self.assertEqual(self.client.get(url, {"team": "x"}).status_code, 400)
+
+    def test_create_page_shows_suggestions(self):
+        self.client.force_login(self.busy)
+        response = self.client.get(reverse("core:task_create"), {"project": self.project.pk})
+        self.assertEqual(len(response.context["suggested_assignees"]), 4)
+        # Віджет перезапитує рекомендації з JSON-ендпоінта при зміні проєкту чи команди
+        self.assertContains(response, f'data-url="{reverse("core:task_suggest_assignees")}"')
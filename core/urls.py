@@ -7,6 +7,7 @@ app_name = 'core'
 urlpatterns = [
     path('tasks/', views.TaskListView.as_view(), name='task_list'),
     path('tasks/create/', views.TaskCreateView.as_view(), name='task_create'),
+    path('tasks/suggest-assignees/', views.AssigneeSuggestionsView.as_view(), name='task_suggest_assignees'),
     path('tasks/<int:pk>/', views.TaskDetailView.as_view(), name='task_detail'),
     path('tasks/<int:pk>/update/', views.TaskUpdateView.as_view(), name='task_update'),
     path('tasks/<int:pk>/complete/', views.TaskCompleteView.as_view(), name='task_complete'),
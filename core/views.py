@@ -1,13 +1,16 @@
 # core/views.py (або tasks/views.py)
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
-from django.views.generic import CreateView, UpdateView, DetailView, DeleteView, ListView
+from django.views.generic import CreateView, UpdateView, DetailView, DeleteView, ListView, View
 
 from .forms import TaskForm, TaskUpdateForm
 from .models import Task
+from .pagination import CachedCountMixin, KeysetPaginationMixin
+from .search import search_queryset
+from .suggestions import suggest_assignees
 from .tasks import send_task_assignment_email
 
 
@@ -24,6 +27,17 @@ class TaskCreateView(LoginRequiredMixin, CreateView):
             kwargs['project_id'] = project_id
         return kwargs
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        params = self.request.POST if self.request.method == 'POST' else self.request.GET
+        try:
+            project_id = int(params.get('project') or 0) or None
+            team_id = int(params.get('team') or 0) or None
+        except ValueError:
+            project_id = team_id = None
+        context['suggested_assignees'] = suggest_assignees(project_id, team_id)
+        return context
+
     def get_initial(self):
         initial = super().get_initial()
         initial['is_completed'] = False
@@ -75,41 +89,46 @@ class TaskCompleteView(LoginRequiredMixin, UpdateView):
         return redirect('tasks:detail', pk=self.object.id)
 
 
-class TaskListView(LoginRequiredMixin, ListView):
+class TaskListView(LoginRequiredMixin, CachedCountMixin, KeysetPaginationMixin, ListView):
     model = Task
     template_name = 'core/task_list.html'
     context_object_name = 'tasks'
     paginate_by = 20
+    count_cap = 10000
 
     def get_queryset(self):
-        queryset = Task.objects.all()
+        queryset = Task.objects.for_listing()
 
         # Фільтрація за статусом
         status = self.request.GET.get('status', 'all')
         if status == 'completed':
-            queryset = queryset.filter(is_completed=True)
+            queryset = queryset.completed()
         elif status == 'active':
-            queryset = queryset.filter(is_completed=False)
+            queryset = queryset.active()
         elif status == 'overdue':
-            queryset = queryset.filter(is_completed=False, deadline__lt=timezone.now())
+            queryset = queryset.overdue()
 
         # Фільтрація за пріоритетом
         priority = self.request.GET.get('priority')
         if priority:
             queryset = queryset.filter(priority=priority)
 
-        # Пошук
+        # Пошук (FTS5, якщо доступний, інакше icontains)
+        ranked = False
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search)
-            )
+            queryset, ranked = search_queryset(queryset, search)
 
         # Сортування
         sort_by = self.request.GET.get('sort', '-deadline')
-        if sort_by in ['name', 'deadline', 'priority', '-name', '-deadline', '-priority']:
-            queryset = queryset.order_by(sort_by)
+        if ranked and 'sort' not in self.request.GET:
+            # Без явного сортування результати пошуку йдуть за релевантністю
+            queryset = queryset.order_by('search_rank', 'id')
+        elif sort_by in ['priority', '-priority']:
+            # Пріоритет сортуємо за терміновістю, а не за алфавітом
+            queryset = queryset.order_by_priority(descending=sort_by.startswith('-'))
+        elif sort_by in ['name', 'deadline', '-name', '-deadline']:
+            queryset = queryset.order_by(sort_by, 'id')
 
         return queryset
 
@@ -135,3 +154,16 @@ class TaskDeleteView(LoginRequiredMixin, DeleteView):
         if self.object.project:
             return reverse_lazy('projects:detail', kwargs={'pk': self.object.project.id})
         return reverse_lazy('core:task_list')
+
+
+class AssigneeSuggestionsView(LoginRequiredMixin, View):
+    """Рекомендовані виконавці (JSON): ?project=&team="""
+
+    def get(self, request, *args, **kwargs):
+        try:
+            project_id = int(request.GET.get('project') or 0) or None
+            team_id = int(request.GET.get('team') or 0) or None
+        except ValueError:
+            return JsonResponse({'error': 'Некоректні параметри'}, status=400)
+
+        return JsonResponse({'suggestions': suggest_assignees(project_id, team_id)})
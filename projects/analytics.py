@@ -0,0 +1,160 @@
+# projects/analytics.py
+"""Аналітика проєктів на NumPy.
+
+Прогноз дати завершення проєктів за швидкістю виконання завдань.
+
+Усі проєкти рахуються разом: завдання читаються одним values_list, виконання
+розкладаються по днях у матрицю (проєкт x день), а швидкість - нахил
+накопиченої кількості виконаних завдань за останні FORECAST_WINDOW_DAYS днів -
+рахується для всіх рядків матриці одночасно.
+
+Cycle time (finished_at - created_at) - перцентилі по проєктах, командах або
+типах завдань з однієї вибірки двох колонок.
+"""
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import FloatField, Func, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import Project, Task, TaskType, Team
+
+FORECAST_WINDOW_DAYS = 28
+# Прогноз далі за цей горизонт вважаємо невідомим (і не виходимо за межі date)
+FORECAST_HORIZON_DAYS = 3650
+CYCLE_TIME_PERCENTILES = (50, 90, 99)
+# group_by -> (поле завдання, модель групи)
+CYCLE_TIME_GROUPS = {
+    'project': ('project_id', Project),
+    'team': ('team_id', Team),
+    'task_type': ('task_type_id', TaskType),
+}
+
+
+def forecasts_cache_key(day):
+    return f'project_forecasts:{day}'
+
+
+def compute_forecasts(today=None, window=FORECAST_WINDOW_DAYS):
+    """{project_id: прогноз} для всіх проєктів"""
+    today = today or timezone.localdate()
+    start = today - timedelta(days=window - 1)
+
+    projects = list(Project.objects.order_by('id').values_list('id', 'deadline'))
+    if not projects:
+        return {}
+    project_ids = np.array([pk for pk, _ in projects])
+
+    # Невиконані завдання (day = None) і виконані за вікно
+    rows = list(
+        Task.objects.filter(project__isnull=False)
+        .filter(
+            Q(is_completed=False)
+            | Q(finished_at__gte=timezone.make_aware(datetime.combine(start, time.min)))
+        )
+        .annotate(day=TruncDate('finished_at'))
+        .values_list('project_id', 'day')
+    )
+    task_projects = np.array([pk for pk, _ in rows], dtype=np.int64)
+    days = np.array([day for _, day in rows], dtype='datetime64[D]')
+
+    index = np.searchsorted(project_ids, task_projects)
+    is_open = np.isnat(days)
+    remaining = np.bincount(index[is_open], minlength=len(projects))
+
+    offsets = (days[~is_open] - np.datetime64(start)).astype(np.int64)
+    in_window = (offsets >= 0) & (offsets < window)
+    daily = np.zeros((len(projects), window))
+    np.add.at(daily, (index[~is_open][in_window], offsets[in_window]), 1)
+
+    # Нахил МНК накопиченої кривої = виконаних завдань на день
+    cumulative = daily.cumsum(axis=1)
+    t = np.arange(window) - (window - 1) / 2
+    velocity = (cumulative - cumulative.mean(axis=1, keepdims=True)) @ t / (t @ t)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_needed = np.where(remaining == 0, 0, np.ceil(remaining / velocity))
+    days_needed[days_needed > FORECAST_HORIZON_DAYS] = np.inf
+
+    forecasts = {}
+    for (pk, deadline), rate, left, needed in zip(projects, velocity, remaining, days_needed):
+        forecast_date = today + timedelta(days=int(needed)) if np.isfinite(needed) else None
+        forecasts[pk] = {
+            'velocity': round(float(rate), 2),
+            'remaining': int(left),
+            'forecast_date': forecast_date,
+            'deadline': deadline,
+            'on_track': forecast_date <= deadline if forecast_date and deadline else None,
+        }
+    return forecasts
+
+
+def get_project_forecasts():
+    """Прогнози з кешу; скидаються, коли змінюється стан виконання завдань"""
+    today = timezone.localdate()
+    key = forecasts_cache_key(today)
+    forecasts = cache.get(key)
+    if forecasts is None:
+        forecasts = compute_forecasts(today)
+        cache.set(key, forecasts, settings.PROJECT_FORECAST_CACHE_TIMEOUT)
+    return forecasts
+
+
+def invalidate_forecasts():
+    cache.delete(forecasts_cache_key(timezone.localdate()))
+
+
+class EpochSeconds(Func):
+    """Момент часу в секундах як число. Різниця дат через DurationField на SQLite
+    рахується Python-функцією для кожного рядка - на великій історії це в рази повільніше."""
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, template='(julianday(%(expressions)s) * 86400.0)', **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='UNIX_TIMESTAMP(%(expressions)s)', **extra_context)
+
+
+def cycle_time_percentiles(tasks, group_by='project'):
+    """Перцентилі cycle time (години) виконаних завдань по групах.
+
+    Тривалість у секундах рахує БД; одна вибірка (група, тривалість),
+    далі сортування і np.percentile по зрізах кожної групи.
+    """
+    field, model = CYCLE_TIME_GROUPS[group_by]
+    rows = list(
+        tasks.filter(is_completed=True, created_at__isnull=False, finished_at__isnull=False)
+        .exclude(**{f'{field}__isnull': True})
+        .annotate(cycle_time=EpochSeconds('finished_at') - EpochSeconds('created_at'))
+        .values_list(field, 'cycle_time')
+    )
+    if not rows:
+        return []
+
+    groups = np.fromiter((group for group, _ in rows), dtype=np.int64, count=len(rows))
+    hours = np.fromiter((seconds for _, seconds in rows), dtype=np.float64, count=len(rows)) / 3600
+
+    order = np.argsort(groups, kind='stable')
+    groups, hours = groups[order], hours[order]
+    group_ids, starts, counts = np.unique(groups, return_index=True, return_counts=True)
+    names = dict(model.objects.filter(pk__in=group_ids.tolist()).values_list('pk', 'name'))
+
+    result = []
+    for group_id, start, count in zip(group_ids.tolist(), starts, counts):
+        values = hours[start:start + count]
+        percentiles = np.percentile(values, CYCLE_TIME_PERCENTILES)
+        result.append({
+            'id': group_id,
+            'name': names.get(group_id),
+            'count': int(count),
+            'mean': round(float(values.mean()), 2),
+            **{f'p{p}': round(float(value), 2) for p, value in zip(CYCLE_TIME_PERCENTILES, percentiles)},
+        })
+    return result
@@ -0,0 +1,79 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.models import Project, Task, Team, Worker
+from projects.analytics import invalidate_forecasts
+from projects.stats import invalidate_project_stats
+
+
+def _team_project_ids(team_ids):
+    return Project.objects.filter(teams__in=team_ids).values_list('id', flat=True).distinct()
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_project_stats(instance, **kwargs):
+    # Завдання могли перенести в інший проєкт - скидаємо обидва
+    old_project_id = getattr(instance, '_loaded_values', {}).get('project_id')
+    invalidate_project_stats([instance.project_id, old_project_id])
+
+
+@receiver(post_save, sender=Task)
+def invalidate_task_forecasts(instance, created, **kwargs):
+    # Прогноз залежить лише від того, скільки і коли завдань виконано/залишилось
+    loaded = getattr(instance, '_loaded_values', {})
+    if (
+        created
+        or loaded.get('is_completed') != instance.is_completed
+        or loaded.get('project_id') != instance.project_id
+    ):
+        invalidate_forecasts()
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_deleted_task_forecasts(**kwargs):
+    invalidate_forecasts()
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project(instance, **kwargs):
+    invalidate_project_stats([instance.pk])
+    invalidate_forecasts()
+
+
+@receiver(post_save, sender=Team)
+@receiver(pre_delete, sender=Team)
+def invalidate_team_projects(instance, **kwargs):
+    invalidate_project_stats(_team_project_ids([instance.pk]))
+
+
+@receiver(m2m_changed, sender=Project.teams.through)
+def invalidate_project_teams(instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_project_stats([instance.pk])
+    elif action == 'pre_clear':
+        invalidate_project_stats(instance.projects.values_list('id', flat=True))
+    else:
+        invalidate_project_stats(pk_set)
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+def invalidate_team_members(instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        team_ids = [instance.pk]
+    elif action == 'pre_clear':
+        team_ids = list(instance.teams.values_list('id', flat=True))
+    else:
+        team_ids = pk_set
+    invalidate_project_stats(_team_project_ids(team_ids))
+
+
+@receiver(pre_delete, sender=Worker)
+def invalidate_worker_team_projects(instance, **kwargs):
+    # Членства працівника видаляються каскадом, без m2m_changed
+    invalidate_project_stats(_team_project_ids(instance.teams.values('id')))
@@ -0,0 +1,68 @@
+# projects/stats.py
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def stats_cache_key(project_id):
+    return f'project_stats:{project_id}'
+
+
+def annotate_team_stats(teams, project):
+    """Лічильники завдань проєкту для кожної команди (учасники - збережене member_count)"""
+    in_project = Q(tasks__project=project)
+    return teams.annotate(
+        task_count=Count('tasks', filter=in_project),
+        completed_count=Count('tasks', filter=in_project & Q(tasks__is_completed=True)),
+        overdue_count=Count('tasks', filter=in_project & Q(
+            tasks__is_completed=False, tasks__deadline__lt=timezone.now()
+        )),
+    )
+
+
+def build_project_stats(project):
+    """Рахує статистику проєкту без кешу"""
+    stats = project.stats
+
+    # Статистика по командах одним запитом
+    teams_stats = [
+        {
+            'name': team.name,
+            'members': team.member_count,
+            'tasks': team.task_count,
+            'completed': team.completed_count,
+            'overdue': team.overdue_count
+        }
+        for team in annotate_team_stats(project.teams.all(), project)
+    ]
+
+    return {
+        'progress': stats['progress'],
+        'tasks': {
+            'total': stats['total'],
+            'completed': stats['completed'],
+            'active': stats['active'],
+            'overdue': stats['overdue']
+        },
+        'priority_distribution': list(
+            project.tasks.values('priority').annotate(count=Count('id')).order_by('priority')
+        ),
+        'teams': teams_stats
+    }
+
+
+def get_project_stats(project):
+    """Статистика проєкту з кешу; перераховується лише після змін"""
+    key = stats_cache_key(project.pk)
+    data = cache.get(key)
+    if data is None:
+        data = build_project_stats(project)
+        cache.set(key, data, settings.PROJECT_STATS_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_project_stats(project_ids):
+    keys = [stats_cache_key(pk) for pk in set(project_ids) if pk is not None]
+    if keys:
+        cache.delete_many(keys)
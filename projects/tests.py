@@ -1,3 +1,378 @@
+from datetime import timedelta
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.counters import rebuild_counters
+from core.factories import build_task, create_project, create_project_with_tasks, create_task, create_worker
+from core.models import Project, Task, TaskType, Team
+from core.pagination import encode_cursor
+from core.tasks import snapshot_projects
+from projects.analytics import compute_forecasts, get_project_forecasts
+from projects.stats import annotate_team_stats, get_project_stats
+
+
+class ProjectTaskViewsQueryCountTests(TestCase):
+    """Кількість запитів для завдань проєкту не залежить від кількості рядків"""
+    sizes = [10, 100, 1000]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_worker("owner")
+        cls.workers = [create_worker(f"worker{i}") for i in range(3)]
+        cls.team = Team.objects.create(name="Core", leader=cls.user)
+        cls.team.members.add(cls.user, *cls.workers)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def create_project(self, size):
+        return create_project_with_tasks(self.user, self.team, self.workers, size)
+
+    def test_export_tasks_csv(self):
+        for size in self.sizes:
+            project = self.create_project(size)
+            response = self.client.get(reverse("projects:export-tasks", kwargs={"pk": project.pk}))
+            with self.subTest(size=size), self.assertNumQueries(2):
+                content = b"".join(response.streaming_content).decode()
+            self.assertEqual(len(content.splitlines()), size + 1)
+
+    def test_project_tasks_api(self):
+        for size in self.sizes:
+            project = self.create_project(size)
+            url = reverse("projects:api-tasks", kwargs={"pk": project.pk})
+            seen, cursor = [], ""
+            while True:
+                with self.subTest(size=size, cursor=cursor), self.assertNumQueries(5):
+                    data = self.client.get(url, {"limit": 500, "cursor": cursor}).json()
+                seen.extend(task["id"] for task in data["tasks"])
+                cursor = data["next_cursor"]
+                if not cursor:
+                    break
+            self.assertEqual(len(seen), size)
+            self.assertEqual(len(set(seen)), size)
+
+    def test_project_tasks_api_ndjson(self):
+        for size in self.sizes:
+            project = self.create_project(size)
+            response = self.client.get(
+                reverse("projects:api-tasks", kwargs={"pk": project.pk}), {"format": "ndjson"}
+            )
+            with self.subTest(size=size), self.assertNumQueries(2):
+                lines = b"".join(response.streaming_content).splitlines()
+            self.assertEqual(len(lines), size)
+
+    def test_project_tasks_api_invalid_cursor(self):
+        project = self.create_project(10)
+        response = self.client.get(
+            reverse("projects:api-tasks", kwargs={"pk": project.pk}), {"cursor": "garbage"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+        cursor = encode_cursor([timezone.now(), "abc"])
+        response = self.client.get(reverse("projects:api-tasks", kwargs={"pk": project.pk}), {"cursor": cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_project_detail_view(self):
+        for size in self.sizes:
+            project = self.create_project(size)
+            with self.subTest(size=size), self.assertNumQueries(8):
+                response = self.client.get(
+                    reverse("projects:detail", kwargs={"pk": project.pk}), {"sort": "priority"}
+                )
+            self.assertEqual(response.status_code, 200)
+
+    def test_project_list_view(self):
+        for size in [2, 10]:
+            for _ in range(size):
+                self.create_project(size)
+            rebuild_counters()
+            with self.subTest(size=size), self.assertNumQueries(5):
+                response = self.client.get(reverse("projects:list"))
+            self.assertEqual(response.status_code, 200)
+            for project in response.context["projects"]:
+                self.assertEqual(project.progress, project.get_progress())
+                self.assertEqual(project.overdue_tasks, project.stats["overdue"])
+
+
+class ProjectOwnerViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_worker("owner")
+        cls.stranger = create_worker("stranger")
+        cls.project = create_project(cls.owner)
+        cls.team = Team.objects.create(name="Core", leader=cls.owner)
+
+    def project_queries(self, request, *args):
+        with CaptureQueriesContext(connection) as ctx:
+            response = request(*args)
+        return response, [q["sql"] for q in ctx.captured_queries if '"core_project"' in q["sql"]]
+
+    def test_update_page_loads_project_once(self):
+        self.client.force_login(self.owner)
+        url = reverse("projects:update", kwargs={"pk": self.project.pk})
+        response, queries = self.project_queries(self.client.get, url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+
+    def test_toggle_and_stage_are_single_update(self):
+        self.client.force_login(self.owner)
+        toggle = reverse("projects:toggle-active", kwargs={"pk": self.project.pk})
+        stage = reverse("projects:change-stage", kwargs={"pk": self.project.pk})
+        self.client.post(toggle)
+        self.client.post(stage, {"stage": "testing"})
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.is_active, self.project.stage), (False, "testing"))
+
+        response, queries = self.project_queries(self.client.post, toggle)
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(queries[0].startswith("UPDATE"))
+        self.assertIn(f'Проєкт "{self.project.name}" активовано!', [str(m) for m in get_messages(response.wsgi_request)])
+
+    def test_stranger_is_denied(self):
+        self.client.force_login(self.stranger)
+        pk = self.project.pk
+        self.client.post(reverse("projects:toggle-active", kwargs={"pk": pk}))
+        self.client.post(reverse("projects:add-team", kwargs={"pk": pk}), {"team_id": self.team.pk})
+        response = self.client.post(reverse("projects:delete", kwargs={"pk": pk}))
+        self.assertRedirects(response, reverse("projects:detail", kwargs={"pk": pk}), fetch_redirect_response=False)
+        self.project.refresh_from_db()
+        self.assertTrue(self.project.is_active)
+        self.assertFalse(self.project.teams.exists())
+
+    def test_missing_project_is_404(self):
+        self.client.force_login(self.owner)
+        response = self.client.post(reverse("projects:toggle-active", kwargs={"pk": 0}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_owner_adds_team_and_deletes(self):
+        self.client.force_login(self.owner)
+        pk = self.project.pk
+        self.client.post(reverse("projects:add-team", kwargs={"pk": pk}), {"team_id": self.team.pk})
+        self.assertTrue(self.project.teams.filter(pk=self.team.pk).exists())
+        response = self.client.post(reverse("projects:delete", kwargs={"pk": pk}), follow=True)
+        self.assertContains(response, "видалено")
+        self.assertFalse(Project.objects.filter(pk=pk).exists())
+
+
+class ProjectSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_worker("owner")
+        cls.project = create_project(cls.user, name="A")
+        cls.empty = create_project(cls.user, name="B")
+        now = timezone.now()
+        Task.objects.bulk_create([
+            build_task(name="done", deadline=now, is_completed=True, project=cls.project),
+            build_task(name="late", deadline=now - timedelta(days=1), project=cls.project),
+            build_task(name="open", deadline=now + timedelta(days=1), project=cls.project),
+        ])
+
+    def test_snapshot_is_idempotent_and_served(self):
+        with self.assertNumQueries(3):
+            snapshot_projects()
+        snapshot_projects()
+        snapshot = self.project.snapshots.get()
+        self.assertEqual(
+            (snapshot.total_tasks, snapshot.open_tasks, snapshot.completed_tasks, snapshot.overdue_tasks),
+            (3, 2, 1, 1),
+        )
+        self.assertEqual(self.empty.snapshots.get().total_tasks, 0)
+
+        self.client.force_login(self.user)
+        url = reverse("projects:burndown", kwargs={"pk": self.project.pk})
+        series = self.client.get(url).json()["series"]
+        self.assertEqual(series, [
+            {"date": str(timezone.localdate()), "total": 3, "open": 2, "completed": 1, "overdue": 1}
+        ])
+        self.assertEqual(self.client.get(url, {"from": "2020-01-01", "to": "2020-01-31"}).json()["series"], [])
+        self.assertEqual(self.client.get(url, {"from": "2020-02-31"}).status_code, 400)
+
+
+class ForecastTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_worker("owner")
+        cls.project = create_project(cls.user, name="A", deadline=timezone.localdate() + timedelta(days=10))
+        cls.idle = create_project(cls.user, name="B")
+        now = timezone.now()
+        # Одне завдання на день протягом усього вікна, 14 ще відкриті
+        Task.objects.bulk_create(
+            [
+                build_task(name=f"done {i}", deadline=now, is_completed=True,
+                           finished_at=now - timedelta(days=i), project=cls.project)
+                for i in range(28)
+            ] + [
+                build_task(name=f"open {i}", deadline=now, project=project)
+                for i in range(14)
+                for project in (cls.project, cls.idle)
+            ]
+        )
+
+    def test_forecast(self):
+        with self.assertNumQueries(2):
+            forecasts = compute_forecasts()
+        today = timezone.localdate()
+        self.assertEqual(forecasts[self.project.pk]["velocity"], 1.0)
+        self.assertEqual(forecasts[self.project.pk]["forecast_date"], today + timedelta(days=14))
+        self.assertFalse(forecasts[self.project.pk]["on_track"])
+        self.assertEqual(forecasts[self.idle.pk]["remaining"], 14)
+        self.assertIsNone(forecasts[self.idle.pk]["forecast_date"])
+
+    def test_tiny_velocity_is_past_horizon(self):
+        slow = create_project(self.user, name="Slow")
+        now = timezone.now()
+        done = build_task(deadline=now, is_completed=True, finished_at=now, project=slow)
+        Task.objects.bulk_create(
+            [done] + [build_task(deadline=now, task_type=done.task_type, project=slow) for _ in range(30000)],
+            batch_size=1000,
+        )
+        forecast = compute_forecasts()[slow.pk]
+        self.assertGreater(forecast["velocity"], 0)
+        self.assertEqual(forecast["remaining"], 30000)
+        self.assertIsNone(forecast["forecast_date"])
+        self.assertIsNone(forecast["on_track"])
+
+    def test_stats_json_is_cached_until_completion(self):
+        self.client.force_login(self.user)
+        url = reverse("projects:stats", kwargs={"pk": self.project.pk})
+        headers = {"Accept": "application/json"}
+        self.assertEqual(self.client.get(url, headers=headers).json()["forecast"]["remaining"], 14)
+        self.assertEqual(get_project_forecasts()[self.project.pk]["remaining"], 14)
+
+        task = self.project.tasks.filter(is_completed=False).first()
+        task.is_completed = True
+        task.save()
+        self.assertEqual(self.client.get(url, headers=headers).json()["forecast"]["remaining"], 13)
+
+
+class CycleTimeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_worker("owner")
+        cls.bug = TaskType.objects.create(name="Bug")
+        cls.feature = TaskType.objects.create(name="Feature")
+        cls.project = create_project(cls.user)
+        created = timezone.now() - timedelta(days=30)
+        # Bug: 1..100 годин, Feature: 10 годин; одне без created_at (старі дані)
+        tasks = Task.objects.bulk_create([
+            build_task(name=f"bug {i}", deadline=created, is_completed=True, task_type=cls.bug, project=cls.project)
+            for i in range(1, 101)
+        ] + [
+            build_task(name="feature", deadline=created, is_completed=True, task_type=cls.feature, project=cls.project),
+            build_task(name="legacy", deadline=created, is_completed=True, task_type=cls.feature, project=cls.project),
+        ])
+        for task, hours in zip(tasks, list(range(1, 101)) + [10]):
+            Task.objects.filter(pk=task.pk).update(created_at=created, finished_at=created + timedelta(hours=hours))
+        Task.objects.filter(name="legacy").update(created_at=None, finished_at=created)
+
+    def test_percentiles_by_task_type(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(4):  # сесія, користувач, вибірка, назви груп
+            data = self.client.get(reverse("projects:cycle-time"), {"group_by": "task_type"}).json()
+        bug, feature = data["groups"]
+        self.assertEqual((bug["name"], bug["count"], bug["p50"], bug["p90"]), ("Bug", 100, 50.5, 90.1))
+        self.assertEqual((feature["name"], feature["count"], feature["p99"]), ("Feature", 1, 10.0))
+
+    def test_invalid_group(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("projects:cycle-time"), {"group_by": "owner"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ProjectStatsCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_worker("owner")
+        cls.dev = create_worker("dev")
+        cls.project = create_project(cls.user)
+        cls.team = Team.objects.create(name="Core", leader=cls.user)
+        cls.project.teams.add(cls.team)
+        cls.task = create_task(project=cls.project, team=cls.team)
+
+    def setUp(self):
+        cache.clear()
+
+    def stats(self):
+        # Свіжий об'єкт проєкту - лічильники читаються з БД, статистика з кешу
+        return get_project_stats(Project.objects.get(pk=self.project.pk))
+
+    def test_stats_are_cached(self):
+        self.stats()
+        with self.assertNumQueries(1):
+            self.stats()
+
+    def test_task_edit_invalidates(self):
+        self.assertEqual(self.stats()["tasks"]["completed"], 0)
+        self.task.is_completed = True
+        self.task.save()
+        self.assertEqual(self.stats()["tasks"]["completed"], 1)
+        self.assertEqual(self.stats()["teams"][0]["completed"], 1)
+
+    def test_member_add_invalidates(self):
+        self.assertEqual(self.stats()["teams"][0]["members"], 0)
+        self.team.members.add(self.dev)
+        self.assertEqual(self.stats()["teams"][0]["members"], 1)
+
+    def test_worker_delete_invalidates(self):
+        self.team.members.add(self.dev)
+        self.assertEqual(self.stats()["teams"][0]["members"], 1)
+        self.dev.delete()
+        self.assertEqual(self.stats()["teams"][0]["members"], 0)
+
+    def test_project_teams_change_invalidates(self):
+        other = Team.objects.create(name="Other", leader=self.user)
+        self.assertEqual(len(self.stats()["teams"]), 1)
+        self.project.teams.add(other)
+        self.assertEqual(len(self.stats()["teams"]), 2)
+        # Зворотний бік зв'язку теж скидає кеш
+        other.projects.clear()
+        self.assertEqual(len(self.stats()["teams"]), 1)
+
+
+class TeamStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_worker("owner")
+        cls.project = create_project(cls.user, name="A")
+        other = create_project(cls.user, name="B")
+        cls.core = Team.objects.create(name="Core", leader=cls.user)
+        cls.idle = Team.objects.create(name="Idle", leader=cls.user)
+        cls.core.members.add(cls.user)
+        cls.project.teams.add(cls.core, cls.idle)
+        now = timezone.now()
+        Task.objects.bulk_create([
+            build_task(project=cls.project, team=cls.core, is_completed=True),
+            build_task(project=cls.project, team=cls.core, deadline=now - timedelta(days=1)),
+            build_task(project=cls.project, team=cls.core, deadline=now + timedelta(days=1)),
+            # Завдання команди в іншому проєкті не рахуються
+            build_task(project=other, team=cls.core),
+        ])
+
+    def test_one_query_for_all_teams(self):
+        with self.assertNumQueries(1):
+            teams = {
+                team.name: (team.member_count, team.task_count, team.completed_count, team.overdue_count)
+                for team in annotate_team_stats(self.project.teams.all(), self.project)
+            }
+        self.assertEqual(teams, {"Core": (1, 3, 1, 1), "Idle": (0, 0, 0, 0)})
+
 
-# Create your tests here.
+class ProjectSearchTests(TestCase):
+    def test_ranked_pages_have_unique_tiebreak(self):
+        user = create_worker("owner")
+        projects = [create_project(user, name="Alpha") for _ in range(25)]
+        # Однаковий ранг і час створення - порядок визначає лише id
+        Project.objects.update(created_at=timezone.now())
+        self.client.force_login(user)
+        url = reverse("projects:list")
+        seen = []
+        for page in (1, 2, 3):
+            response = self.client.get(url, {"search": "alpha", "page": page})
+            seen += [project.pk for project in response.context["object_list"]]
+        self.assertEqual(seen, sorted((project.pk for project in projects), reverse=True))
@@ -39,6 +39,12 @@ urlpatterns = [
     # Статистика проєкту
     path('<int:pk>/stats/', views.ProjectStatsView.as_view(), name='stats'),
 
+    # Burndown зі щоденних знімків
+    path('<int:pk>/burndown/', views.ProjectBurndownView.as_view(), name='burndown'),
+
+    # Cycle time по проєктах / командах / типах завдань
+    path('analytics/cycle-time/', views.CycleTimeView.as_view(), name='cycle-time'),
+
     # API ендпоінти (якщо потрібно)
     path('api/<int:pk>/tasks/', views.ProjectTasksAPIView.as_view(), name='api-tasks'),
 
@@ -1,19 +1,76 @@
 # projects/views.py
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, View
+from django.views.generic.detail import SingleObjectMixin
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import redirect, get_object_or_404
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.db.models import Count, Q
-from django.http import JsonResponse, HttpResponse
+from django.core.paginator import Paginator
+from django.db.models import F, Q
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 import csv
-from datetime import datetime
+import json
+from datetime import datetime, timedelta
 
 from .forms import ProjectForm
-from core.models import Project
+from core.models import Project, Task, Team
+from core.pagination import KeysetPaginationMixin, encode_cursor, decode_cursor
+from core.search import search_queryset
+from .analytics import CYCLE_TIME_GROUPS, cycle_time_percentiles, get_project_forecasts
+from .stats import get_project_stats
 
 
-class ProjectListView(LoginRequiredMixin, ListView):
+class ProjectOwnerRequiredMixin:
+    """Дія дозволена лише власнику проєкту або суперюзеру.
+
+    Проєкт завантажується один раз за запит (разом з owner): той самий об'єкт
+    бачать перевірка доступу, форма, видалення і відповідь.
+    single_update = True - режим без завантаження рядка: зміни робить
+    update_project() одним UPDATE, умова власника - частина WHERE.
+    """
+    model = Project
+    single_update = False
+    permission_denied_message = 'Ви не маєте дозволу змінювати цей проєкт'
+
+    def get_queryset(self):
+        return Project.objects.select_related('owner')
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_project'):
+            self._project = super().get_object()
+        return self._project
+
+    def has_project_permission(self, project):
+        user = self.request.user
+        return user.is_superuser or project.owner_id == user.pk
+
+    def deny(self):
+        messages.error(self.request, self.permission_denied_message)
+        return redirect('projects:detail', pk=self.kwargs['pk'])
+
+    def update_project(self, **values):
+        """Один UPDATE без SELECT; False - немає доступу (Http404 - немає проєкту).
+        Сигнали моделі при цьому не надсилаються."""
+        projects = Project.objects.filter(pk=self.kwargs['pk'])
+        user = self.request.user
+        allowed = projects if user.is_superuser else projects.filter(owner=user)
+        if allowed.update(**values):
+            return True
+        if not projects.exists():
+            raise Http404('Проєкт не знайдено')
+        return False
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.single_update and not self.has_project_permission(self.get_object()):
+            return self.deny()
+        return super().dispatch(request, *args, **kwargs)
+
+
+class ProjectListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """Список всіх проєктів"""
     model = Project
     template_name = 'projects/project_list.html'
@@ -21,7 +78,7 @@ class ProjectListView(LoginRequiredMixin, ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        queryset = Project.objects.all().order_by('-created_at')
+        queryset = Project.objects.for_listing().order_by('-created_at', '-id')
 
         # Фільтрація за статусом
         status = self.request.GET.get('status', 'all')
@@ -35,13 +92,12 @@ class ProjectListView(LoginRequiredMixin, ListView):
         if stage:
             queryset = queryset.filter(stage=stage)
 
-        # Пошук за назвою
+        # Пошук за назвою (FTS5, якщо доступний, інакше icontains)
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search)
-            )
+            queryset, ranked = search_queryset(queryset, search)
+            if ranked:
+                queryset = queryset.order_by('search_rank', '-created_at', '-id')
 
         # Фільтрація за власником
         owner = self.request.GET.get('owner')
@@ -84,6 +140,7 @@ class ProjectDetailView(LoginRequiredMixin, DetailView):
     model = Project
     template_name = 'projects/project_detail.html'
     context_object_name = 'project'
+    tasks_paginate_by = 20
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -91,36 +148,33 @@ class ProjectDetailView(LoginRequiredMixin, DetailView):
 
         # Отримуємо завдання з фільтрами
         task_filter = self.request.GET.get('filter', 'all')
+        tasks = project.tasks.for_listing()
         if task_filter == 'completed':
-            tasks = project.tasks.filter(is_completed=True)
+            tasks = tasks.completed()
         elif task_filter == 'active':
-            tasks = project.tasks.filter(is_completed=False)
+            tasks = tasks.active()
         elif task_filter == 'overdue':
-            # Використовуємо Python-фільтрацію для is_overdue
-            all_tasks = project.tasks.filter(is_completed=False)
-            tasks = [task for task in all_tasks if task.is_overdue]
-        else:
-            tasks = project.tasks.all()
+            tasks = tasks.overdue()
 
         # Сортування
         sort_by = self.request.GET.get('sort', 'deadline')
         if sort_by == 'priority':
-            # Сортування по пріоритету в Python
-            priority_order = {'URGENT': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
-            tasks = sorted(tasks, key=lambda t: priority_order.get(t.priority, 4))
+            tasks = tasks.order_by_priority()
         elif sort_by == 'name':
-            tasks = tasks.order_by('name')
+            tasks = tasks.order_by('name', 'id')
         else:  # deadline за замовчуванням
-            tasks = tasks.order_by('deadline')
+            tasks = tasks.order_by('deadline', 'id')
+
+        page_obj = Paginator(tasks, self.tasks_paginate_by).get_page(self.request.GET.get('page'))
 
-        context['tasks'] = tasks
+        context['tasks'] = page_obj.object_list
+        context['page_obj'] = page_obj
+        context['is_paginated'] = page_obj.has_other_pages()
         context['task_filter'] = task_filter
         context['sort_by'] = sort_by
 
-        # Статистика
-        context['total_tasks'] = project.tasks.count()
-        context['completed_tasks'] = project.get_completed_tasks().count()
-        context['active_tasks'] = project.get_active_tasks().count()
+        # Статистика (один агрегатний запит; get_progress читає збережені лічильники, без запиту)
+        context['stats'] = project.stats
 
         # Всі доступні працівники для призначення
         context['available_workers'] = project.get_all_workers()
@@ -128,151 +182,139 @@ class ProjectDetailView(LoginRequiredMixin, DetailView):
         return context
 
 
-class ProjectUpdateView(LoginRequiredMixin, UpdateView):
+class ProjectUpdateView(LoginRequiredMixin, ProjectOwnerRequiredMixin, UpdateView):
     """Редагування проєкту"""
-    model = Project
     form_class = ProjectForm
     template_name = 'projects/project_form.html'
+    permission_denied_message = 'Ви не маєте дозволу редагувати цей проєкт'
 
     def get_success_url(self):
         messages.success(self.request, f'Проєкт "{self.object.name}" оновлено!')
         return reverse_lazy('projects:detail', kwargs={'pk': self.object.pk})
 
-    def dispatch(self, request, *args, **kwargs):
-        # Перевіряємо, чи користувач є власником або суперюзером
-        project = self.get_object()
-        if not (request.user == project.owner or request.user.is_superuser):
-            messages.error(request, 'Ви не маєте дозволу редагувати цей проєкт')
-            return redirect('projects:detail', pk=project.pk)
-        return super().dispatch(request, *args, **kwargs)
-
 
-class ProjectDeleteView(LoginRequiredMixin, DeleteView):
+class ProjectDeleteView(LoginRequiredMixin, ProjectOwnerRequiredMixin, DeleteView):
     """Видалення проєкту"""
-    model = Project
     template_name = 'projects/project_confirm_delete.html'
     success_url = reverse_lazy('projects:list')
+    permission_denied_message = 'Ви не маєте дозволу видаляти цей проєкт'
 
-    def dispatch(self, request, *args, **kwargs):
-        project = self.get_object()
-        if not (request.user == project.owner or request.user.is_superuser):
-            messages.error(request, 'Ви не маєте дозволу видаляти цей проєкт')
-            return redirect('projects:detail', pk=project.pk)
-        return super().dispatch(request, *args, **kwargs)
-
-    def delete(self, request, *args, **kwargs):
-        project = self.get_object()
-        messages.success(request, f'Проєкт "{project.name}" видалено!')
-        return super().delete(request, *args, **kwargs)
+    def form_valid(self, form):
+        # DeleteView видаляє у form_valid (delete() на POST не викликається)
+        messages.success(self.request, f'Проєкт "{self.object.name}" видалено!')
+        return super().form_valid(form)
 
 
 # ===== ДОДАТКОВІ VIEWS =====
 
-class ProjectToggleActiveView(LoginRequiredMixin, UpdateView):
-    """Швидке перемикання активності проєкту"""
-    model = Project
-    fields = []  # Не потрібні поля
+class ProjectToggleActiveView(LoginRequiredMixin, ProjectOwnerRequiredMixin, View):
+    """Швидке перемикання активності проєкту (один UPDATE і SELECT стану для повідомлення)"""
+    single_update = True
 
     def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        self.object.is_active = not self.object.is_active
-        self.object.save()
+        if not self.update_project(is_active=~F('is_active')):
+            return self.deny()
 
-        status = "активовано" if self.object.is_active else "деактивовано"
-        messages.success(request, f'Проєкт "{self.object.name}" {status}!')
+        # Новий стан читаємо одним легким SELECT після UPDATE
+        name, is_active = Project.objects.values_list('name', 'is_active').get(pk=kwargs['pk'])
+        status = "активовано" if is_active else "деактивовано"
+        messages.success(request, f'Проєкт "{name}" {status}!')
+        return redirect('projects:detail', pk=kwargs['pk'])
 
-        return redirect('projects:detail', pk=self.object.pk)
 
-
-class ProjectChangeStageView(LoginRequiredMixin, UpdateView):
-    """Швидка зміна етапу проєкту"""
-    model = Project
-    fields = []  # Не потрібні поля
+class ProjectChangeStageView(LoginRequiredMixin, ProjectOwnerRequiredMixin, View):
+    """Швидка зміна етапу проєкту (один UPDATE)"""
+    single_update = True
 
     def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
         new_stage = request.POST.get('stage')
+        stages = dict(Project.STAGE_CHOICES)
 
-        if new_stage in dict(Project.STAGE_CHOICES):
-            self.object.stage = new_stage
-            self.object.save()
-            messages.success(request, f'Етап проєкту змінено на "{self.object.get_stage_display()}"')
+        if new_stage in stages:
+            if not self.update_project(stage=new_stage):
+                return self.deny()
+            messages.success(request, f'Етап проєкту змінено на "{stages[new_stage]}"')
 
-        return redirect('projects:detail', pk=self.object.pk)
+        return redirect('projects:detail', pk=kwargs['pk'])
 
 
-class ProjectAddTeamView(LoginRequiredMixin, UpdateView):
+class ProjectAddTeamView(LoginRequiredMixin, ProjectOwnerRequiredMixin, SingleObjectMixin, View):
     """Додавання команди до проєкту"""
-    model = Project
-    fields = []  # Не потрібні поля
 
     def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
+        project = self.get_object()
         team_id = request.POST.get('team_id')
 
         try:
             team = Team.objects.get(id=team_id)
-            self.object.teams.add(team)
+            project.teams.add(team)
             messages.success(request, f'Команду "{team.name}" додано до проєкту!')
-        except Team.DoesNotExist:
+        except (Team.DoesNotExist, ValueError):
             messages.error(request, 'Команду не знайдено')
 
-        return redirect('projects:detail', pk=self.object.pk)
+        return redirect('projects:detail', pk=project.pk)
 
 
-class ProjectRemoveTeamView(LoginRequiredMixin, UpdateView):
+class ProjectRemoveTeamView(LoginRequiredMixin, ProjectOwnerRequiredMixin, SingleObjectMixin, View):
     """Видалення команди з проєкту"""
-    model = Project
-    fields = []  # Не потрібні поля
 
     def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
+        project = self.get_object()
         team_id = kwargs.get('team_id')
 
         try:
             team = Team.objects.get(id=team_id)
-            self.object.teams.remove(team)
+            project.teams.remove(team)
             messages.success(request, f'Команду "{team.name}" видалено з проєкту!')
         except Team.DoesNotExist:
             messages.error(request, 'Команду не знайдено')
 
-        return redirect('projects:detail', pk=self.object.pk)
+        return redirect('projects:detail', pk=project.pk)
+
+
+class Echo:
+    """Псевдо-буфер для csv.writer: повертає рядок замість запису у файл"""
+
+    def write(self, value):
+        return value
 
 
 class ExportProjectTasksView(LoginRequiredMixin, DetailView):
-    """Експорт завдань проєкту в CSV"""
+    """Потоковий експорт завдань проєкту в CSV"""
     model = Project
+    chunk_size = 2000
 
     def get(self, request, *args, **kwargs):
         project = self.get_object()
+        writer = csv.writer(Echo())
 
-        # Створюємо HTTP-відповідь з типом CSV
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{project.name}_tasks_{datetime.now().date()}.csv"'
-
-        writer = csv.writer(response)
-        # Заголовки
-        writer.writerow([
-            'Назва', 'Опис', 'Тип', 'Пріоритет',
-            'Дедлайн', 'Статус', 'Виконавці', 'Створено'
-        ])
-
-        # Дані
-        for task in project.tasks.all():
-            assignees = ', '.join([str(a) for a in task.assignees.all()])
-            status = 'Виконано' if task.is_completed else 'Активне'
-
-            writer.writerow([
-                task.name,
-                task.description[:100],  # Обрізаємо довгий опис
-                task.task_type.name if task.task_type else '',
-                task.get_priority_display(),
-                task.deadline.strftime('%d.%m.%Y %H:%M'),
-                status,
-                assignees,
-                task.created_at.strftime('%d.%m.%Y')
+        def rows():
+            # Заголовки
+            yield writer.writerow([
+                'Назва', 'Опис', 'Тип', 'Пріоритет',
+                'Дедлайн', 'Статус', 'Виконавці', 'Створено', 'Завершено'
             ])
 
+            # Дані читаємо порціями, виконавці підтягуються окремо для кожної порції
+            tasks = project.tasks.for_listing().order_by('id')
+            for task in tasks.iterator(chunk_size=self.chunk_size):
+                assignees = ', '.join([str(a) for a in task.assignees.all()])
+                status = 'Виконано' if task.is_completed else 'Активне'
+
+                yield writer.writerow([
+                    task.name,
+                    task.description[:100],  # Обрізаємо довгий опис
+                    task.task_type.name if task.task_type else '',
+                    task.get_priority_display(),
+                    task.deadline.strftime('%d.%m.%Y %H:%M'),
+                    status,
+                    assignees,
+                    task.created_at.strftime('%d.%m.%Y') if task.created_at else '',
+                    task.finished_at.strftime('%d.%m.%Y') if task.finished_at else ''
+                ])
+
+        response = StreamingHttpResponse(rows(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{project.name}_tasks_{datetime.now().date()}.csv"'
         return response
 
 
@@ -283,36 +325,21 @@ class ProjectStatsView(LoginRequiredMixin, DetailView):
     def get(self, request, *args, **kwargs):
         project = self.get_object()
 
-        # Статистика по завданнях
-        tasks_by_priority = project.tasks.values('priority').annotate(count=Count('id'))
-        tasks_by_status = {
-            'total': project.tasks.count(),
-            'completed': project.get_completed_tasks().count(),
-            'active': project.get_active_tasks().count(),
-            'overdue': len([t for t in project.tasks.filter(is_completed=False) if t.is_overdue])
-        }
-
-        # Статистика по командах
-        teams_stats = []
-        for team in project.teams.all():
-            team_tasks = project.tasks.filter(team=team)
-            teams_stats.append({
-                'name': team.name,
-                'members': team.members.count(),
-                'tasks': team_tasks.count(),
-                'completed': team_tasks.filter(is_completed=True).count()
-            })
+        # Статистика кешується і скидається сигналами при змінах
+        stats = get_project_stats(project)
 
         data = {
             'project': {
                 'name': project.name,
                 'stage': project.get_stage_display(),
-                'progress': project.get_progress(),
+                'progress': stats['progress'],
                 'days_left': (project.deadline - datetime.now().date()).days if project.deadline else None
             },
-            'tasks': tasks_by_status,
-            'priority_distribution': list(tasks_by_priority),
-            'teams': teams_stats
+            'tasks': stats['tasks'],
+            'priority_distribution': stats['priority_distribution'],
+            'teams': stats['teams'],
+            # Прогноз рахується для всіх проєктів разом і кешується
+            'forecast': get_project_forecasts().get(project.pk)
         }
 
         if request.headers.get('Accept') == 'application/json':
@@ -324,38 +351,151 @@ class ProjectStatsView(LoginRequiredMixin, DetailView):
         return self.render_to_response(context)
 
 
+def serialize_task(task):
+    """Спільне JSON-представлення завдання для API"""
+    return {
+        'id': task.id,
+        'name': task.name,
+        'description': task.description[:100],
+        'priority': task.get_priority_display(),
+        'deadline': task.deadline.strftime('%d.%m.%Y %H:%M'),
+        'is_completed': task.is_completed,
+        'is_overdue': task.is_overdue,
+        'assignees': [{'id': a.id, 'name': str(a)} for a in task.assignees.all()],
+        'type': task.task_type.name if task.task_type else None
+    }
+
+
 class ProjectTasksAPIView(LoginRequiredMixin, DetailView):
-    """API для отримання завдань проєкту (для AJAX)"""
+    """API для отримання завдань проєкту (для AJAX)
+
+    Курсорна пагінація за (deadline, id): ?limit=&cursor=<next_cursor>.
+    ?format=ndjson віддає всі завдання потоком, по одному JSON на рядок.
+    """
     model = Project
+    default_limit = 50
+    max_limit = 500
+    chunk_size = 2000
 
     def get(self, request, *args, **kwargs):
         project = self.get_object()
         filter_status = request.GET.get('status', 'all')
 
+        tasks = project.tasks.for_listing()
         if filter_status == 'completed':
-            tasks = project.tasks.filter(is_completed=True)
+            tasks = tasks.completed()
         elif filter_status == 'active':
-            tasks = project.tasks.filter(is_completed=False)
-        else:
-            tasks = project.tasks.all()
-
-        # Формуємо JSON відповідь
-        tasks_data = []
-        for task in tasks:
-            tasks_data.append({
-                'id': task.id,
-                'name': task.name,
-                'description': task.description[:100],
-                'priority': task.get_priority_display(),
-                'deadline': task.deadline.strftime('%d.%m.%Y %H:%M'),
-                'is_completed': task.is_completed,
-                'is_overdue': task.is_overdue,
-                'assignees': [{'id': a.id, 'name': str(a)} for a in task.assignees.all()],
-                'type': task.task_type.name if task.task_type else None
-            })
+            tasks = tasks.active()
+        elif filter_status == 'overdue':
+            tasks = tasks.overdue()
+        tasks = tasks.order_by('deadline', 'id')
+
+        cursor = request.GET.get('cursor')
+        if cursor:
+            try:
+                deadline, last_id = decode_cursor(cursor)
+                deadline = parse_datetime(deadline)
+                last_id = int(last_id)
+            except (ValueError, TypeError):
+                return JsonResponse({'error': 'Некоректний курсор'}, status=400)
+            if deadline is None:
+                return JsonResponse({'error': 'Некоректний курсор'}, status=400)
+            tasks = tasks.filter(
+                Q(deadline__gt=deadline) | Q(deadline=deadline, id__gt=last_id)
+            )
+
+        if request.GET.get('format') == 'ndjson':
+            lines = (
+                json.dumps(serialize_task(task), ensure_ascii=False) + '\n'
+                for task in tasks.iterator(chunk_size=self.chunk_size)
+            )
+            return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
+        try:
+            limit = min(max(int(request.GET.get('limit', self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+
+        # Беремо на один рядок більше, щоб знати, чи є наступна сторінка
+        page = list(tasks[:limit + 1])
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor([page[-1].deadline.isoformat(), page[-1].id])
+
+        tasks_data = [serialize_task(task) for task in page]
 
         return JsonResponse({
             'project': project.name,
             'tasks': tasks_data,
-            'count': len(tasks_data)
+            'count': len(tasks_data),
+            'next_cursor': next_cursor
+        })
+
+
+class ProjectBurndownView(LoginRequiredMixin, DetailView):
+    """Burndown проєкту зі щоденних знімків: ?from=YYYY-MM-DD&to=YYYY-MM-DD"""
+    model = Project
+    default_days = 30
+
+    def get(self, request, *args, **kwargs):
+        project = self.get_object()
+        try:
+            date_to = parse_date(request.GET.get('to', '')) or timezone.localdate()
+            date_from = parse_date(request.GET.get('from', '')) or date_to - timedelta(days=self.default_days)
+        except ValueError:
+            return JsonResponse({'error': 'Некоректна дата'}, status=400)
+        if date_from > date_to:
+            return JsonResponse({'error': 'Некоректний діапазон дат'}, status=400)
+
+        series = project.snapshots.filter(date__range=(date_from, date_to)).values(
+            'date', 'total_tasks', 'open_tasks', 'completed_tasks', 'overdue_tasks'
+        )
+
+        return JsonResponse({
+            'project': project.name,
+            'from': date_from,
+            'to': date_to,
+            'series': [
+                {
+                    'date': row['date'],
+                    'total': row['total_tasks'],
+                    'open': row['open_tasks'],
+                    'completed': row['completed_tasks'],
+                    'overdue': row['overdue_tasks'],
+                }
+                for row in series
+            ]
+        })
+
+
+class CycleTimeView(LoginRequiredMixin, View):
+    """Cycle time завдань (години, p50/p90/p99): ?group_by=project|team|task_type&from=&to=
+
+    from/to - дати завершення; ?project= обмежує вибірку одним проєктом.
+    """
+
+    def get(self, request, *args, **kwargs):
+        group_by = request.GET.get('group_by', 'project')
+        if group_by not in CYCLE_TIME_GROUPS:
+            return JsonResponse({'error': 'Некоректне групування'}, status=400)
+
+        tasks = Task.objects.all()
+        try:
+            date_from = parse_date(request.GET.get('from', ''))
+            date_to = parse_date(request.GET.get('to', ''))
+            project = int(request.GET['project']) if request.GET.get('project') else None
+        except ValueError:
+            return JsonResponse({'error': 'Некоректні параметри'}, status=400)
+        if date_from:
+            tasks = tasks.filter(finished_at__date__gte=date_from)
+        if date_to:
+            tasks = tasks.filter(finished_at__date__lte=date_to)
+        if project:
+            tasks = tasks.filter(project_id=project)
+
+        return JsonResponse({
+            'group_by': group_by,
+            'unit': 'hours',
+            'groups': cycle_time_percentiles(tasks, group_by)
         })
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -89,6 +90,24 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "task-manager"),
+    }
+}
+
+# Статистика проєкту інвалідовується сигналами, TTL лише обмежує застарілість "прострочених"
+PROJECT_STATS_CACHE_TIMEOUT = int(os.getenv("PROJECT_STATS_CACHE_TIMEOUT", 300))
+# Прогнози завершення скидаються при зміні стану завдань; TTL - на випадок bulk-змін
+PROJECT_FORECAST_CACHE_TIMEOUT = int(os.getenv("PROJECT_FORECAST_CACHE_TIMEOUT", 60 * 60))
+# Рекомендовані виконавці: короткий TTL замість інвалідації
+ASSIGNEE_SUGGESTIONS_CACHE_TIMEOUT = int(os.getenv("ASSIGNEE_SUGGESTIONS_CACHE_TIMEOUT", 60))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -148,6 +167,8 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
 EMAIL_PORT = os.getenv("EMAIL_PORT", 587)
 EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", True)
+# Скільки листів надсилати за одне SMTP-з'єднання
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 50))
 
 CELERY_BROKER_URL = 'redis://localhost:6379/0'  # Адреса Redis
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
@@ -155,4 +176,7 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Europe/Kiev'
-CELERY_ENABLE_UTC = True
\ No newline at end of file
+CELERY_ENABLE_UTC = True
+
+# За скільки до дедлайну надсилати нагадування (плануються для кожного завдання окремо)
+TASK_REMINDER_LEAD_TIME = timedelta(hours=int(os.getenv("TASK_REMINDER_LEAD_HOURS", 24)))
\ No newline at end of file
@@ -1,3 +1,44 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.factories import create_task, create_worker
+from core.models import Team
+
+
+class TeamWorkloadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lead, cls.dev, cls.outsider = [create_worker(name) for name in ("lead", "dev", "outsider")]
+        cls.team = Team.objects.create(name="Core", leader=cls.lead)
+        cls.team.members.add(cls.lead, cls.dev)
+        now = timezone.now()
+        specs = [
+            (now + timedelta(days=1), "URGENT", False, [cls.lead, cls.dev]),
+            (now + timedelta(days=1), "LOW", False, [cls.lead]),
+            (now + timedelta(days=3), "HIGH", True, [cls.lead]),  # виконане - не рахується
+            (now - timedelta(days=2), "MEDIUM", False, [cls.dev]),
+            (now + timedelta(days=40), "HIGH", False, [cls.dev]),  # поза вікном
+        ]
+        for deadline, priority, done, assignees in specs:
+            task = create_task(name=priority, deadline=deadline, priority=priority, is_completed=done)
+            task.assignees.add(*assignees)
+
+    def test_workload_matrix(self):
+        self.client.force_login(self.lead)
+        url = reverse("teams:team_workload", kwargs={"pk": self.team.pk})
+        with self.assertNumQueries(5):  # сесія, користувач, команда, учасники, матриця
+            data = self.client.get(url, {"days": 7}).json()
+        tomorrow = str(timezone.localdate() + timedelta(days=1))
+        index = data["days"].index(tomorrow)
+        lead, dev = sorted(data["workers"], key=lambda w: w["id"])
+        self.assertEqual(lead["load"][index], 5)
+        self.assertEqual((lead["total"], lead["overdue"]), (5, 0))
+        self.assertEqual((dev["total"], dev["overdue"]), (4, 2))
 
-# Create your tests here.
+    def test_only_members(self):
+        self.client.force_login(self.outsider)
+        response = self.client.get(reverse("teams:team_workload", kwargs={"pk": self.team.pk}))
+        self.assertEqual(response.status_code, 404)
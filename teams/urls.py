@@ -12,6 +12,7 @@ urlpatterns = [
     path('<int:pk>/delete/', views.TeamDeleteView.as_view(), name='team_delete'),
     path('<int:pk>/add-members/', views.TeamAddMembersView.as_view(), name='team_add_members'),
     path('<int:pk>/remove-member/<int:user_id>/', views.TeamRemoveMemberView.as_view(), name='team_remove_member'),
+    path('<int:pk>/workload/', views.TeamWorkloadView.as_view(), name='team_workload'),
 ]
 # todo
 # 1. celery + redis => queue for sending emails task
@@ -8,9 +8,14 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import redirect, get_object_or_404
 from django.urls import reverse_lazy
 from django.contrib import messages
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
 
 from core.models import Team, Worker
 from teams.forms import TeamCreateForm, TeamUpdateForm, TeamAddMembersForm
+from teams.workload import PRIORITY_WEIGHTS, workload_matrix
 
 
 class TeamListView(LoginRequiredMixin, ListView):
@@ -132,4 +137,43 @@ class TeamRemoveMemberView(LoginRequiredMixin, View):
         else:
             messages.error(request, 'Ви не можете видалити цього користувача!')
 
-        return redirect('teams:team_detail', pk=team.pk)
\ No newline at end of file
+        return redirect('teams:team_detail', pk=team.pk)
+
+
+class TeamWorkloadView(LoginRequiredMixin, DetailView):
+    """Навантаження учасників команди по днях (JSON): ?start=YYYY-MM-DD&days=14"""
+    model = Team
+    default_days = 14
+    max_days = 90
+
+    def get_queryset(self):
+        # Тільки команди, де користувач є учасником
+        return Team.objects.filter(members=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        team = self.get_object()
+        try:
+            start = parse_date(request.GET.get('start', '')) or timezone.localdate()
+            days = min(max(int(request.GET.get('days', self.default_days)), 1), self.max_days)
+        except ValueError:
+            return JsonResponse({'error': 'Некоректні параметри'}, status=400)
+
+        members = list(team.members.order_by('first_name', 'last_name', 'id'))
+        load, overdue = workload_matrix([m.pk for m in members], start, days)
+
+        return JsonResponse({
+            'team': team.name,
+            'start': start,
+            'days': [start + timedelta(days=i) for i in range(days)],
+            'weights': PRIORITY_WEIGHTS,
+            'workers': [
+                {
+                    'id': member.pk,
+                    'name': member.full_name,
+                    'load': row.tolist(),
+                    'total': float(row.sum()),
+                    'overdue': float(late),
+                }
+                for member, row, late in zip(members, load, overdue)
+            ]
+        })
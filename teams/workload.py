@@ -0,0 +1,56 @@
+# teams/workload.py
+"""Навантаження працівників: матриця (працівник x день) відкритих завдань.
+
+Одна вибірка з таблиці виконавців (з дедлайном і пріоритетом завдання),
+матриця будується NumPy без циклів по працівниках.
+"""
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import Task
+
+# Вага завдання в навантаженні за пріоритетом
+PRIORITY_WEIGHTS = {
+    'URGENT': 4,
+    'HIGH': 3,
+    'MEDIUM': 2,
+    'LOW': 1,
+}
+
+
+def workload_matrix(worker_ids, start, days):
+    """Навантаження за днями дедлайнів [start, start + days).
+
+    Повертає (load, overdue): load - масив (len(worker_ids), days) сум ваг
+    завдань з дедлайном у цей день, overdue - сума ваг прострочених на start.
+    """
+    worker_ids = np.asarray(worker_ids, dtype=np.int64)
+    load = np.zeros((len(worker_ids), days))
+    overdue = np.zeros(len(worker_ids))
+    if not len(worker_ids) or not days:
+        return load, overdue
+
+    end = timezone.make_aware(datetime.combine(start + timedelta(days=days), time.min))
+    rows = list(
+        Task.assignees.through.objects
+        .filter(worker_id__in=worker_ids.tolist(), task__is_completed=False, task__deadline__lt=end)
+        .annotate(day=TruncDate('task__deadline'))
+        .values_list('worker_id', 'day', 'task__priority')
+    )
+    if not rows:
+        return load, overdue
+
+    workers, deadlines, priorities = zip(*rows)
+    order = np.argsort(worker_ids)
+    rows_index = order[np.searchsorted(worker_ids, np.array(workers), sorter=order)]
+    offsets = (np.array(deadlines, dtype='datetime64[D]') - np.datetime64(start)).astype(np.int64)
+    names, inverse = np.unique(np.array(priorities), return_inverse=True)
+    weights = np.array([PRIORITY_WEIGHTS.get(name, 1) for name in names], dtype=np.float64)[inverse]
+
+    is_overdue = offsets < 0
+    np.add.at(load, (rows_index[~is_overdue], offsets[~is_overdue]), weights[~is_overdue])
+    np.add.at(overdue, rows_index[is_overdue], weights[is_overdue])
+    return load, overdue
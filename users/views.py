@@ -6,7 +6,7 @@ from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
 from django.views.generic import FormView, DetailView, UpdateView
 
-from core.models import Worker, Task, Team
+from core.models import Project, Worker, Task, Team
 from users.forms import SignUpForm, WorkerUpdateForm
 
 
@@ -55,9 +55,7 @@ class ProfileDetailView(LoginRequiredMixin, DetailView):
         user_teams = Team.objects.filter(members=user)
 
         # Проєкти через команди
-        user_projects = set()
-        for team in user_teams:
-            user_projects.update(team.projects.all())
+        user_projects = Project.objects.for_worker(user)
 
         context.update({
             'tasks_stats': tasks_stats,